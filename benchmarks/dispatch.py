@@ -0,0 +1,97 @@
+""" Time how long an INVOCATION and an EVENT take to be dispatched to
+their handler as the number of registrations and subscriptions grows.
+
+No Router is needed: the Session is populated directly and nothing is
+sent over the wire. Run as ::
+
+    $ python benchmarks/dispatch.py --counts 10 100 1000 10000
+
+"""
+import argparse
+from time import time as now
+
+import eventlet
+
+from wampy.messages import Message
+from wampy.messages.event import Event
+from wampy.messages.invocation import Invocation
+from wampy.peers.clients import Client
+from wampy.peers.routers import Crossbar
+
+
+class BenchmarkService(Client):
+
+    def procedure(self, *args, **kwargs):
+        return None
+
+    def handler(self, *args, **kwargs):
+        return None
+
+
+def make_service(count):
+    service = BenchmarkService(router=Crossbar())
+    session = service.session
+    session.send_message = lambda message: None
+
+    # the same callable under many registrations and subscriptions, as
+    # it is the cost of finding it that is measured
+    for index in range(count):
+        session.registration_map["procedure_{}".format(index)] = index
+        session.procedures[index] = (
+            "procedure", service.procedure, None, None)
+        session.subscription_map[index] = "handler", "topic"
+        session.handlers[index] = [
+            (service.handler, "handler", "topic", "exact", None)]
+
+    return service
+
+
+def time_invocations(service, count, repeat):
+    registration_ids = [index % count for index in range(repeat)]
+
+    started = now()
+    for request_id, registration_id in enumerate(registration_ids):
+        message = [
+            Message.INVOCATION, request_id, registration_id, {}, [], {},
+        ]
+        Invocation(*message).process(message, service)
+        # let the invocation's green thread run to completion
+        eventlet.sleep()
+
+    return (now() - started) / repeat
+
+
+def time_events(service, count, repeat):
+    subscription_ids = [index % count for index in range(repeat)]
+
+    started = now()
+    for publication_id, subscription_id in enumerate(subscription_ids):
+        message = [
+            Message.EVENT, subscription_id, publication_id, {}, [], {},
+        ]
+        Event(*message).process(message, service)
+
+    return (now() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--counts', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=10000)
+    args = parser.parse_args()
+
+    print("{:>10} {:>16} {:>16}".format(
+        "count", "invocation (us)", "event (us)"))
+
+    for count in args.counts:
+        service = make_service(count)
+        invocation = time_invocations(service, count, args.repeat)
+        event = time_events(service, count, args.repeat)
+
+        print("{:>10} {:>16.2f} {:>16.2f}".format(
+            count, invocation * 1e6, event * 1e6))
+
+
+if __name__ == '__main__':
+    main()
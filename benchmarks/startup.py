@@ -0,0 +1,87 @@
+""" Time how long a Client with many procedures takes to start.
+
+Run from the root of the repository, which starts Crossbar.io with the
+testing configuration, e.g. ::
+
+    $ python benchmarks/startup.py --procedures 2000
+
+and compare with ``--serial``, which registers one procedure per round
+trip to the Router as wampy used to.
+
+"""
+import argparse
+import logging
+from time import time as now
+
+from wampy.peers.clients import Client
+from wampy.peers.routers import Crossbar
+from wampy.roles.callee import register_procedure, register_rpc
+
+
+def make_service(procedures):
+    def make_procedure(name):
+        def procedure(self):
+            return name
+
+        procedure.__name__ = name
+        return register_rpc(procedure)
+
+    attributes = {
+        "procedure_{}".format(index): make_procedure(
+            "procedure_{}".format(index))
+        for index in range(procedures)
+    }
+
+    return type("BenchmarkService", (Client,), attributes)
+
+
+class SerialClient(Client):
+
+    def register_roles(self):
+        for name in dir(self.__class__):
+            if getattr(getattr(self.__class__, name), 'callee', False):
+                register_procedure(self.session, name)
+
+
+def time_startup(router, service_class):
+    service = service_class(router=router)
+
+    started = now()
+    service.start()
+    elapsed = now() - started
+
+    registered = len(service.registration_map)
+    service.stop()
+    return registered, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--procedures', type=int, default=1000)
+    parser.add_argument('--serial', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    router = Crossbar(
+        config_path='./wampy/testing/configs/crossbar.config.json',
+        crossbar_directory='./',
+    )
+    router.start()
+
+    service_class = make_service(args.procedures)
+    if args.serial:
+        service_class = type(
+            "SerialBenchmarkService", (SerialClient, service_class), {})
+
+    try:
+        registered, elapsed = time_startup(router, service_class)
+    finally:
+        router.stop()
+
+    print("registered {} procedures in {:.3f}s ({})".format(
+        registered, elapsed, "serial" if args.serial else "pipelined"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import eventlet
+import pytest
+from mock import Mock
+
+from wampy.errors import WampyTimeOutError
+from wampy.peers.bus import LocalBus
+from wampy.peers.clients import Client
+from wampy.roles.callee import register_rpc
+from wampy.roles.subscriber import subscribe
+
+from test.helpers import assert_stops_raising
+
+
+class LocalService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(LocalService, self).__init__(*args, **kwargs)
+        self.events = []
+
+    @register_rpc
+    def echo(self, payload):
+        return payload
+
+    @register_rpc
+    def count_to(self, number):
+        for count in range(1, number + 1):
+            yield count
+
+    @register_rpc
+    def sleep(self, seconds):
+        eventlet.sleep(seconds)
+
+    @subscribe(topic="local.news")
+    def news_handler(self, **kwargs):
+        self.events.append(kwargs['headline'])
+
+
+@pytest.fixture
+def bus():
+    return LocalBus()
+
+
+@pytest.yield_fixture
+def service(router, bus):
+    with LocalService(router=router, local_bus=bus) as client:
+        yield client
+
+
+@pytest.yield_fixture
+def caller(router, bus):
+    with Client(router=router, local_bus=bus) as client:
+        yield client
+
+
+def test_call_is_made_in_process(service, caller):
+    payload = {'nested': [1, 2, 3]}
+
+    assert caller.rpc.echo(payload=payload) is payload
+    assert caller.call("echo", payload) is payload
+    assert caller.session.stats['local_calls'] == 2
+    assert service.session.stats['invocations'] == 2
+
+
+def test_progressive_call_is_made_in_process(service, caller):
+    assert list(caller.call.progressive("count_to", 3)) == [1, 2, 3]
+    assert caller.session.stats['local_calls'] == 1
+
+
+def test_local_call_times_out(service, router, bus):
+    with Client(router=router, local_bus=bus, call_timeout=0.5) as caller:
+        pending = caller.send_call("sleep", args=[5])
+        with pytest.raises(WampyTimeOutError):
+            pending.wait()
+
+        # the invocation is interrupted rather than left to run on
+        def wait_for_interrupt():
+            assert service.session.running_invocations == {}
+
+        assert_stops_raising(wait_for_interrupt)
+
+    # the Router was never told of the invocation, so neither is it told
+    # of the interrupt, which would end the service's Session
+    eventlet.sleep(0.5)
+    assert service.session.connected
+
+    with Client(router=router) as remote_caller:
+        assert remote_caller.rpc.echo(payload="still here") == "still here"
+
+
+def test_call_falls_back_to_the_router(router, caller):
+    # the same procedure, but from a Client not on the bus
+    with LocalService(router=router):
+        assert caller.rpc.echo(payload="hello") == "hello"
+
+    assert caller.session.stats['local_calls'] == 0
+
+
+def test_publish_reaches_local_and_remote_subscribers(
+        router, service, caller,
+):
+    remote_handler = Mock()
+
+    with Client(router=router) as remote:
+        remote.subscribe("local.news", remote_handler)
+
+        caller.publish(topic="local.news", headline="extra")
+
+        def wait_for_events():
+            assert remote_handler.call_count == 1
+
+        assert_stops_raising(wait_for_events)
+
+        # delivered directly and excluded from the Router's fan-out, so
+        # only once
+        eventlet.sleep(0.5)
+        assert service.events == ["extra"]
+        assert service.session.stats['local_events'] == 1
+        assert service.session.stats['events'] == 0
+
+
+def test_stopped_client_is_detached(router, bus):
+    with LocalService(router=router, local_bus=bus) as service:
+        assert bus.clients == [service]
+
+    assert bus.clients == []
+    assert bus.callee("echo") is None
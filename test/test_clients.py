@@ -6,6 +6,9 @@ import pytest
 
 from wampy.peers.clients import Client
 from wampy.roles.callee import register_rpc
+from wampy.roles.subscriber import subscribe
+
+from test.helpers import assert_stops_raising
 
 
 class DateService(Client):
@@ -221,3 +224,105 @@ def test_concurrent_client_calls(binary_number_service, clients):
         results.append(result)
 
     assert sorted(expected_results) == sorted(results)
+
+
+def test_roles_are_collected_once_per_class():
+    class PoliteHelloService(HelloService):
+
+        @register_rpc(invocation_policy="roundrobin")
+        def say_hello(self, name):
+            return "Good day {}".format(name)
+
+        @subscribe(topic="greetings")
+        def greetings_handler(self, **kwargs):
+            pass
+
+    procedures, subscriptions = PoliteHelloService.get_role_registry()
+    assert PoliteHelloService.get_role_registry() is (
+        PoliteHelloService.get_role_registry())
+
+    # the override hides the procedure of the parent
+    assert sorted(
+        (p['procedure_name'], p['invocation_policy']) for p in procedures
+    ) == [("say_greeting", "single"), ("say_hello", "roundrobin")]
+    assert [s['topic'] for s in subscriptions] == ["greetings"]
+
+    # the parent keeps a registry of its own
+    procedures, subscriptions = HelloService.get_role_registry()
+    assert sorted(p['procedure_name'] for p in procedures) == [
+        "say_greeting", "say_hello"]
+    assert subscriptions == []
+
+
+class DrainingService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(DrainingService, self).__init__(*args, **kwargs)
+        self.jobs = []
+
+    @register_rpc
+    def slow_job(self):
+        eventlet.sleep(1)
+        return "done"
+
+    @subscribe(topic="jobs", parallelism=1)
+    def jobs_handler(self, job, **kwargs):
+        eventlet.sleep(0.5)
+        self.jobs.append(job)
+
+
+def test_drain_finishes_the_work_in_hand(router):
+    service = DrainingService(router=router)
+    service.start()
+
+    with Client(router=router) as client:
+        pending = client.send_call("slow_job")
+        client.publish(topic="jobs", job=1)
+
+        def check_busy():
+            assert len(service.session.running_invocations) == 1
+            assert service.session.event_dispatchers.values()[0].pending
+
+        assert_stops_raising(check_busy)
+
+        service.drain(timeout=5)
+
+        response = pending.wait()
+        assert response[3] == ["done"]
+        assert service.jobs == [1]
+        assert client.get_registration_lookup("slow_job") is None
+
+
+def test_drain_whilst_events_keep_coming(router):
+    service = DrainingService(router=router)
+    service.start()
+
+    with Client(router=router) as client:
+        publishing = True
+
+        def publish():
+            job = 0
+            while publishing:
+                job += 1
+                client.publish(topic="jobs", job=job)
+                eventlet.sleep(0.05)
+
+        publisher = eventlet.spawn(publish)
+
+        def check_busy():
+            assert service.session.event_dispatchers.values()[0].pending
+
+        assert_stops_raising(check_busy)
+
+        try:
+            # only what was taken on before is waited for
+            assert service.session.drain(timeout=5) is True
+            handled = list(service.jobs)
+
+            eventlet.sleep(0.5)
+            assert service.jobs == handled
+            assert service.session.stats['events_dropped_draining'] > 0
+        finally:
+            publishing = False
+            publisher.wait()
+            service.stop()
@@ -0,0 +1,181 @@
+import os
+import signal
+
+import eventlet
+import pytest
+
+from wampy.errors import WampyError
+from wampy.peers.clients import Client
+from wampy.peers.pools import ClientPool, ServicePool
+from wampy.roles.callee import register_rpc
+from wampy.roles.subscriber import subscribe
+
+from test.helpers import assert_stops_raising
+
+
+class IdentityService(Client):
+
+    @register_rpc
+    def whoami(self):
+        return {'client_id': self.id, 'pid': os.getpid()}
+
+
+@pytest.yield_fixture
+def caller(router):
+    with Client(router=router) as client:
+        yield client
+
+
+def test_sessions_in_one_process(router, caller):
+    with ServicePool(IdentityService, router=router, sessions=3) as pool:
+        answers = [caller.rpc.whoami() for _ in range(9)]
+
+        client_ids = set(answer['client_id'] for answer in answers)
+        assert len(client_ids) == 3
+        assert set(answer['pid'] for answer in answers) == {os.getpid()}
+
+        stats = pool.stats()
+        assert stats['sessions'] == 3
+        assert stats['invocations'] == 9
+
+
+def test_sessions_over_many_processes(router, caller):
+    pool = ServicePool(
+        IdentityService, router=router, sessions=4, processes=2)
+
+    with pool:
+        answers = [caller.rpc.whoami() for _ in range(8)]
+
+        assert len(set(answer['client_id'] for answer in answers)) == 4
+
+        workers = pool.workers
+        pids = set(answer['pid'] for answer in answers)
+        assert pids == set(worker.pid for worker in workers)
+        assert os.getpid() not in pids
+
+        stats = pool.stats()
+        assert stats['sessions'] == 4
+        assert stats['invocations'] == 8
+
+    assert not any(worker.is_alive() for worker in workers)
+
+
+def test_more_processes_than_sessions(router):
+    with pytest.raises(WampyError):
+        ServicePool(IdentityService, router=router, sessions=1, processes=2)
+
+
+def test_crashed_worker_is_restarted(router, caller):
+    pool = ServicePool(
+        IdentityService, router=router, sessions=2, processes=2)
+
+    with pool:
+        crashed, survivor = pool.workers
+        os.kill(crashed.pid, signal.SIGKILL)
+        crashed.process.join()
+
+        pool.restart_crashed_workers()
+
+        replacement = pool.workers[0]
+        assert replacement.pid != crashed.pid
+        assert pool.workers[1] is survivor
+
+        pids = set(caller.rpc.whoami()['pid'] for _ in range(4))
+        assert pids == {replacement.pid, survivor.pid}
+
+
+def test_terminate_propagates_sigterm(router, caller):
+    pool = ServicePool(
+        IdentityService, router=router, sessions=2, processes=2)
+    pool.start()
+
+    workers = pool.workers
+    pool.terminate()
+
+    # the workers ended their sessions and exited of their own accord
+    assert [worker.process.exitcode for worker in workers] == [0, 0]
+
+    def check_unregistered():
+        assert caller.get_registration_lookup("whoami") is None
+
+    assert_stops_raising(check_unregistered)
+
+
+class SlowService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(SlowService, self).__init__(*args, **kwargs)
+        self.messages = []
+
+    @register_rpc
+    def slow_echo(self, value):
+        eventlet.sleep(0.5)
+        return value
+
+    @subscribe(topic="news")
+    def news_handler(self, message, **kwargs):
+        self.messages.append(message)
+
+
+@pytest.yield_fixture
+def slow_service(router):
+    with SlowService(router=router) as service:
+        yield service
+
+
+def test_client_pool_grows_under_load(router, slow_service):
+    with ClientPool(router=router, min_sessions=1, max_sessions=3) as pool:
+        assert pool.size == 1
+
+        pool_of_threads = eventlet.GreenPool()
+        results = list(pool_of_threads.imap(pool.rpc.slow_echo, range(9)))
+
+        assert results == range(9)
+        assert pool.size == 3
+        assert pool.stats() == {'sessions': 3, 'in_flight': 0}
+
+
+def test_client_pool_checks_out_the_least_loaded(router):
+    with ClientPool(router=router, min_sessions=2, max_sessions=2) as pool:
+        first = pool.checkout()
+        second = pool.checkout()
+        assert first is not second
+
+        pool.checkin(first)
+        assert pool.checkout() is first
+
+
+def test_client_pool_publishes(router, slow_service):
+    with ClientPool(router=router) as pool:
+        pool.publish(topic="news", message="extra! extra!")
+
+        def check_received():
+            assert slow_service.messages == ["extra! extra!"]
+
+        assert_stops_raising(check_received)
+
+        assert pool.call("slow_echo", "hello") == "hello"
+
+
+def test_client_pool_replaces_and_trims_clients(router):
+    pool = ClientPool(
+        router=router, min_sessions=1, max_sessions=3, max_idle_time=0)
+
+    with pool:
+        first = pool.checkout()
+        pool.checkout()
+        pool.checkout()
+        assert pool.size == 3
+        for client in list(pool.clients):
+            pool.checkin(client)
+
+        pool.check_health()
+        assert pool.size == 1
+
+        survivor, = pool.clients
+        survivor.session._managed_thread.kill()
+
+        pool.check_health()
+        assert pool.size == 1
+        assert pool.clients[0] is not survivor
+        assert pool.clients[0].session.connected
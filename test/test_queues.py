@@ -0,0 +1,179 @@
+import json
+from collections import Counter
+
+import eventlet
+import pytest
+
+from wampy.errors import WampyError
+from wampy.messages import Message
+from wampy.peers.clients import Client
+from wampy.queues import InboundQueue, OutboundScheduler
+
+from test.helpers import assert_stops_raising
+
+
+def goodbye(reason):
+    return [Message.GOODBYE, {}, reason]
+
+
+class TestInboundQueue(object):
+
+    def test_drop_oldest(self):
+        queue = InboundQueue(maxsize=2)
+        for reason in ("a", "b", "c"):
+            queue.put(goodbye(reason))
+
+        assert queue.dropped == 1
+        assert [queue.get()[2] for _ in range(len(queue))] == ["b", "c"]
+        assert queue.bytes == 0
+
+    def test_drop_newest(self):
+        queue = InboundQueue(maxsize=2, overflow="drop_newest")
+        for reason in ("a", "b", "c"):
+            queue.put(goodbye(reason))
+
+        assert queue.dropped == 1
+        assert [queue.get()[2] for _ in range(len(queue))] == ["a", "b"]
+
+    def test_byte_limit(self):
+        size = len(json.dumps(goodbye("a")))
+        queue = InboundQueue(max_bytes=size * 2)
+        for reason in ("a", "b", "c"):
+            queue.put(goodbye(reason))
+
+        assert len(queue) == 2
+        assert queue.bytes == size * 2
+        assert queue.dropped == 1
+
+    def test_oversized_message_is_let_into_an_empty_queue(self):
+        queue = InboundQueue(max_bytes=1)
+        queue.put(goodbye("a"))
+
+        assert len(queue) == 1
+        assert queue.dropped == 0
+
+    def test_block(self):
+        queue = InboundQueue(maxsize=1, overflow="block")
+        queue.put(goodbye("a"))
+
+        gthread = eventlet.spawn(queue.put, goodbye("b"))
+        eventlet.sleep()
+        assert len(queue) == 1
+
+        assert queue.get()[2] == "a"
+        gthread.wait()
+        assert queue.get()[2] == "b"
+        assert queue.dropped == 0
+
+    def test_invalid_overflow(self):
+        with pytest.raises(WampyError):
+            InboundQueue(overflow="spill")
+
+
+class SlowConnection(object):
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        # as a socket with a full buffer would, yield to the hub
+        eventlet.sleep(0.01)
+        self.sent.append(message)
+
+
+class TestOutboundScheduler(object):
+
+    def test_responses_overtake_publications(self):
+        connection = SlowConnection()
+        scheduler = OutboundScheduler(send=connection.send)
+
+        for index in range(5):
+            scheduler.send_message(Message.PUBLISH, "publish-{}".format(index))
+        assert len(scheduler) == 5
+
+        # the first publication is being written
+        eventlet.sleep()
+        scheduler.send_message(Message.YIELD, "yield")
+        assert connection.sent == ["publish-0", "yield"]
+
+        def check_sent():
+            assert len(connection.sent) == 6
+
+        assert_stops_raising(check_sent)
+        assert len(scheduler) == 0
+        assert scheduler.bytes == 0
+
+    def test_control_before_responses(self):
+        connection = SlowConnection()
+        scheduler = OutboundScheduler(send=connection.send)
+
+        scheduler.send_message(Message.PUBLISH, "publish")
+        eventlet.sleep()
+
+        pool = eventlet.GreenPool()
+        pool.spawn(scheduler.send_message, Message.YIELD, "yield")
+        pool.spawn(scheduler.send_message, Message.GOODBYE, "goodbye")
+        pool.waitall()
+
+        assert connection.sent == ["publish", "goodbye", "yield"]
+
+    def test_publishers_wait_on_the_high_water_mark(self):
+        connection = SlowConnection()
+        stats = Counter()
+        scheduler = OutboundScheduler(
+            send=connection.send, high_water=30, low_water=10, stats=stats)
+
+        published = []
+
+        def publish():
+            for index in range(10):
+                scheduler.send_message(Message.PUBLISH, "publish-{}".format(
+                    index))
+                published.append(index)
+
+        publisher = eventlet.spawn(publish)
+        eventlet.sleep()
+
+        # three messages of 9 bytes, and then the fourth crosses the mark
+        assert published == [0, 1, 2, 3]
+        assert stats['publisher_stalls'] == 1
+
+        publisher.wait()
+        scheduler.flush(timeout=5)
+        assert connection.sent == [
+            "publish-{}".format(index) for index in range(10)]
+
+    def test_failure_drops_the_publications(self):
+        def send(message):
+            raise IOError("connection lost")
+
+        scheduler = OutboundScheduler(send=send)
+        for index in range(3):
+            scheduler.send_message(Message.PUBLISH, "publish")
+
+        eventlet.sleep()
+        assert len(scheduler) == 0
+
+        with pytest.raises(IOError):
+            scheduler.send_message(Message.CALL, "call")
+
+    def test_invalid_water_marks(self):
+        with pytest.raises(WampyError):
+            OutboundScheduler(send=None, high_water=10, low_water=20)
+
+
+def test_events_are_not_queued(router):
+    with Client(router=router) as publisher:
+        with Client(router=router) as subscriber:
+            received = []
+            subscriber.subscribe("ticks", lambda **kwargs: received.append(1))
+
+            for price in range(20):
+                publisher.publish(topic="ticks", price=price)
+
+            def check_received():
+                assert len(received) == 20
+
+            assert_stops_raising(check_received)
+
+            assert len(subscriber.session._message_queue) == 0
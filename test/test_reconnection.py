@@ -0,0 +1,159 @@
+import eventlet
+import pytest
+
+from wampy.errors import WampProtocolError
+from wampy.messages import Message
+from wampy.peers.clients import Client
+from wampy.roles.callee import register_rpc
+from wampy.roles.subscriber import subscribe
+from wampy.session import backoff_delays
+
+from test.helpers import assert_stops_raising
+
+
+class ResilientService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(ResilientService, self).__init__(*args, **kwargs)
+        self.received = []
+
+    @register_rpc
+    def ping(self):
+        return "pong"
+
+    @register_rpc
+    def wait(self, seconds):
+        eventlet.sleep(seconds)
+
+    @subscribe(topic="alerts", parallelism=1)
+    def alerts_handler(self, message, **kwargs):
+        self.received.append(message)
+
+
+@pytest.yield_fixture
+def service(router):
+    with ResilientService(router=router, reconnect=True) as service:
+        yield service
+
+
+def test_backoff_delays_grow_with_jitter():
+    delays = backoff_delays(initial=1, maximum=8, multiplier=2)
+    ceilings = [1, 2, 4, 8, 8, 8]
+
+    for ceiling in ceilings:
+        assert 0 <= next(delays) <= ceiling
+
+
+def test_restore_session_after_router_restart(router, service):
+    registration_ids = service.registration_map.values()
+
+    router.stop()
+    router.start()
+
+    with Client(router=router) as client:
+
+        def check_registered():
+            assert client.rpc.ping() == "pong"
+
+        assert_stops_raising(check_registered, timeout=30)
+
+        assert service.registration_map.values() != registration_ids
+        assert service.session.last_recovery_time > 0
+
+        client.publish(topic="alerts", message="back online")
+
+        def check_received():
+            assert service.received == ["back online"]
+
+        assert_stops_raising(check_received)
+
+
+def test_outstanding_calls_fail_when_the_connection_is_lost(
+        router, service,
+):
+    with Client(router=router, reconnect=True) as client:
+        pending = client.send_call("wait", args=[10], timeout=30)
+
+        router.stop()
+
+        response = pending.wait()
+        assert response[0] == Message.ERROR
+        assert response[4] == "wamp.close.transport_lost"
+
+        router.start()
+
+
+def test_failed_restore_is_retried_in_full(service):
+    session = service.session
+    subscriptions = dict(session.router_subscriptions)
+
+    # an attempt the Router never answers
+    session.request_all = (
+        lambda messages, timeout=5, on_response=None: [None] * len(messages))
+    with pytest.raises(WampProtocolError):
+        session._restore()
+    del session.request_all
+
+    assert session.router_subscriptions == subscriptions
+    assert sorted(session.registration_map) == ["ping", "wait"]
+    assert service.get_subscription_handler_names() == ["alerts_handler"]
+
+
+def test_handler_failure_keeps_the_connection(router, service):
+    session = service.session
+    session_id = session.id
+
+    def failing_handler(message, **kwargs):
+        raise RuntimeError(message)
+
+    # run on the reader, without a dispatcher
+    service.subscribe("alerts", failing_handler)
+
+    with Client(router=router) as client:
+        client.publish(topic="alerts", message="boom")
+        client.publish(topic="alerts", message="still here")
+
+        def check_received():
+            assert service.received[-1] == "still here"
+
+        assert_stops_raising(check_received)
+
+        assert client.rpc.ping() == "pong"
+        assert session.id == session_id
+        assert session._recovery_thread is None
+
+
+def test_recover_from_a_protocol_failure(router, service):
+    session = service.session
+    registration_ids = service.registration_map.values()
+    message_handler = session.message_handler
+
+    def failing_message_handler(message):
+        session.message_handler = message_handler
+        raise WampProtocolError("unexpected")
+
+    session.message_handler = failing_message_handler
+    # left unread from the lost connection, and not to be taken for the
+    # WELCOME of the next
+    session._message_queue.put([Message.GOODBYE, {}, "wamp.close.stale"])
+
+    with Client(router=router) as client:
+        client.publish(topic="alerts", message="boom")
+
+        def check_recovered():
+            assert service.registration_map.values() != registration_ids
+            assert client.rpc.ping() == "pong"
+
+        assert_stops_raising(check_recovered, timeout=30)
+
+        # only the restored IDs are kept
+        assert sorted(session.procedures) == sorted(
+            service.registration_map.values())
+        assert session.handlers.keys() == session.subscription_map.keys()
+
+        client.publish(topic="alerts", message="back online")
+
+        def check_received():
+            assert service.received[-1] == "back online"
+
+        assert_stops_raising(check_received)
@@ -0,0 +1,120 @@
+import eventlet
+import pytest
+
+from wampy.errors import WampyError
+from wampy.messages import Message
+from wampy.peers.clients import Client
+from wampy.roles.cache import ResultCache
+from wampy.roles.callee import register_rpc
+
+from test.helpers import assert_stops_raising
+
+
+class ReferenceDataService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(ReferenceDataService, self).__init__(*args, **kwargs)
+        self.lookups = 0
+
+    @register_rpc
+    def get_config(self, name, default=None):
+        self.lookups += 1
+        return {'name': name, 'lookups': self.lookups}
+
+    @register_rpc
+    def fail(self):
+        self.lookups += 1
+        raise ValueError("no")
+
+
+def make_response(value):
+    return [Message.RESULT, 1, {}, [value], {}]
+
+
+class TestResultCache(object):
+
+    def test_key_ignores_keyword_order(self):
+        cache = ResultCache({'foo': {}})
+
+        assert cache.key('foo', (1,), {'a': 1, 'b': 2}) == cache.key(
+            'foo', (1,), {'b': 2, 'a': 1})
+        assert cache.key('foo', (1,), {}) != cache.key('foo', (2,), {})
+
+    def test_expiry(self):
+        cache = ResultCache({'foo': {'ttl': 0.1}})
+        cache.put('key', 'foo', make_response(1))
+
+        assert cache.get('key') == make_response(1)
+        eventlet.sleep(0.2)
+        assert cache.get('key') is None
+        assert cache.stats == {'hits': 1, 'misses': 1}
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ResultCache({'foo': {}}, max_size=2)
+        cache.put('a', 'foo', make_response('a'))
+        cache.put('b', 'foo', make_response('b'))
+
+        # "a" is now more recently used than "b"
+        cache.get('a')
+        cache.put('c', 'foo', make_response('c'))
+
+        assert len(cache) == 2
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.stats['evictions'] == 1
+
+    def test_invalidate(self):
+        cache = ResultCache({'foo': {}, 'bar': {}})
+        cache.put('a', 'foo', make_response('a'))
+        cache.put('b', 'bar', make_response('b'))
+
+        cache.invalidate('foo')
+
+        assert cache.get('a') is None
+        assert cache.get('b') is not None
+
+    def test_invalid_size(self):
+        with pytest.raises(WampyError):
+            ResultCache({}, max_size=0)
+
+
+@pytest.yield_fixture
+def service(router):
+    with ReferenceDataService(router=router) as client:
+        yield client
+
+
+def test_repeated_calls_are_answered_from_the_cache(router, service):
+    cache = ResultCache({'get_config': {'ttl': 60}, 'fail': {}})
+
+    with Client(router=router, result_cache=cache) as caller:
+        first = caller.rpc.get_config("colour")
+        assert caller.rpc.get_config("colour") == first
+        assert caller.call("get_config", "colour") == first
+        assert caller.rpc.get_config("size")['lookups'] == 2
+
+        # errors are never cached
+        caller.call("fail")
+        caller.call("fail")
+
+    assert service.lookups == 4
+    assert cache.stats['hits'] == 2
+    assert cache.stats['misses'] == 4
+
+
+def test_invalidation_topic(router, service):
+    cache = ResultCache({
+        'get_config': {'invalidation_topic': 'config.changed'},
+    })
+
+    with Client(router=router, result_cache=cache) as caller:
+        assert caller.rpc.get_config("colour")['lookups'] == 1
+
+        with Client(router=router) as publisher:
+            publisher.publish(topic="config.changed", name="colour")
+
+        def wait_for_invalidation():
+            assert cache.stats['invalidations'] == 1
+
+        assert_stops_raising(wait_for_invalidation)
+        assert caller.rpc.get_config("colour")['lookups'] == 2
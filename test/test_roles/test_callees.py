@@ -1,9 +1,13 @@
+import json
+
+import eventlet
 import pytest
 from mock import Mock, call
 
 from wampy.constants import DEFAULT_REALM
+from wampy.messages.yield_ import MemoizedYield, Yield
 from wampy.peers.clients import Client
-from wampy.roles.callee import RpcProxy
+from wampy.roles.callee import RpcProxy, register_rpc
 
 from test.helpers import assert_stops_raising
 
@@ -45,3 +49,98 @@ class TestRpcProxy(object):
                 caller.rpc.dandelions("dandelions")
 
                 assert_stops_raising(wait_for_message)
+
+    def test_register_many_procedures_at_once(self, router, caller):
+        callback = Mock(return_value="ok")
+        procedure_names = ["procedure_{}".format(i) for i in range(500)]
+
+        factory = RpcProxy(
+            router=router,
+            realm=DEFAULT_REALM,
+            procedure_names=procedure_names,
+            callback=callback,
+        )
+
+        with factory:
+            assert sorted(factory.session.registration_map) == sorted(
+                procedure_names)
+            # nothing is left waiting on a response
+            assert factory.session._requests == {}
+
+            with caller:
+                assert caller.rpc.procedure_0() == "ok"
+                assert caller.rpc.procedure_499() == "ok"
+
+
+class PureService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(PureService, self).__init__(*args, **kwargs)
+        self.computed = []
+
+    @register_rpc(cache=True)
+    def square(self, number):
+        self.computed.append(number)
+        return number * number
+
+    @register_rpc(cache={'ttl': 0.2, 'key': lambda user, **kwargs: user})
+    def profile(self, user, request_id=None):
+        self.computed.append(user)
+        return {'user': user, 'request_id': request_id}
+
+    @register_rpc(cache=True)
+    def fail(self):
+        self.computed.append("fail")
+        raise ValueError("not memoized")
+
+
+class TestMemoizedProcedures(object):
+
+    @pytest.yield_fixture
+    def service(self, router):
+        with PureService(router=router) as service:
+            yield service
+
+    @pytest.yield_fixture
+    def caller(self, router):
+        with Client(router=router) as client:
+            yield client
+
+    def test_result_is_memoized(self, service, caller):
+        assert [caller.rpc.square(3) for _ in range(5)] == [9] * 5
+        assert caller.rpc.square(4) == 16
+
+        assert service.computed == [3, 4]
+        assert service.session.stats['memo_hits'] == 4
+        assert service.session.stats['memo_misses'] == 2
+
+    def test_key_function_and_expiry(self, service, caller):
+        first = caller.rpc.profile("alice", request_id=1)
+        # the key ignores the request ID
+        assert caller.rpc.profile("alice", request_id=2) == first
+        assert service.computed == ["alice"]
+
+        eventlet.sleep(0.3)
+
+        assert caller.rpc.profile("alice", request_id=3)['request_id'] == 3
+        assert service.computed == ["alice", "alice"]
+
+    def test_errors_are_not_memoized(self, service, caller):
+        caller.call("fail")
+        caller.call("fail")
+
+        assert service.computed == ["fail", "fail"]
+
+
+def test_memoized_yield_serializes_as_a_yield():
+    result_args = [{u'name': u'sn\xf6w', 'sizes': [1, 2]}]
+    result_kwargs = {'error': None, '_meta': {'procedure_name': 'foo'}}
+
+    memoized = MemoizedYield(
+        1234, result_args, result_kwargs,
+        MemoizedYield.encode_tail(result_args, result_kwargs),
+    )
+    plain = Yield(
+        1234, result_args=result_args, result_kwargs=result_kwargs)
+
+    assert json.loads(memoized.serialize()) == json.loads(plain.serialize())
@@ -0,0 +1,221 @@
+import eventlet
+import pytest
+from eventlet.event import Event
+
+from wampy.errors import WampyError, WampyTimeOutError
+from wampy.messages import Message
+from wampy.peers.clients import Client
+from wampy.roles.callee import register_rpc
+from wampy.roles.caller import call_key
+
+from test.helpers import assert_stops_raising
+
+
+class SlowService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(SlowService, self).__init__(*args, **kwargs)
+        self.finished = []
+
+    @register_rpc
+    def slow(self, seconds):
+        eventlet.sleep(seconds)
+        self.finished.append(seconds)
+        return "slow"
+
+    @register_rpc
+    def fast(self):
+        return "fast"
+
+
+@pytest.yield_fixture
+def slow_service(router):
+    with SlowService(router=router) as service:
+        yield service
+
+
+def test_call_times_out(router, slow_service):
+    with Client(router=router) as client:
+        pending = client.send_call("slow", args=[2], timeout=0.5)
+
+        with pytest.raises(WampyTimeOutError):
+            pending.wait()
+
+
+def test_late_result_is_not_mistaken_for_the_next(router, slow_service):
+    with Client(router=router, call_timeout=0.5) as client:
+        with pytest.raises(WampyTimeOutError):
+            client.rpc.slow(1)
+
+        # let the late RESULT arrive
+        eventlet.sleep(1)
+
+        assert client.rpc.fast() == "fast"
+
+
+def test_cancel_call(router, slow_service):
+    with Client(router=router) as client:
+        pending = client.send_call("slow", args=[1])
+        pending.cancel()
+
+        eventlet.sleep(1.5)
+        assert client.rpc.fast() == "fast"
+
+
+def test_interrupt_aborts_the_invocation(router, slow_service):
+    with Client(router=router) as client:
+        pending = client.send_call("slow", args=[2])
+
+        def check_running():
+            assert len(slow_service.session.running_invocations) == 1
+
+        assert_stops_raising(check_running)
+
+        request_id, = slow_service.session.running_invocations.keys()
+        slow_service.session.message_handler(
+            [Message.INTERRUPT, request_id, {}])
+
+        response = pending.wait()
+        assert response[0] == Message.ERROR
+        assert response[4] == "wamp.error.canceled"
+
+        eventlet.sleep(2)
+        assert slow_service.finished == []
+
+
+class RowService(Client):
+
+    @register_rpc
+    def get_rows(self, count):
+        for index in range(count):
+            yield {'row': index}
+
+    @register_rpc
+    def get_bad_rows(self):
+        yield {'row': 0}
+        raise ValueError("bad row")
+
+
+@pytest.yield_fixture
+def row_service(router):
+    with RowService(router=router) as service:
+        yield service
+
+
+def test_progressive_results(router, row_service):
+    with Client(router=router) as client:
+        rows = client.call.progressive("get_rows", 100)
+        assert list(rows) == [{'row': index} for index in range(100)]
+
+
+def test_progressive_results_are_lazy(router, row_service):
+    with Client(router=router) as client:
+        rows = client.call.progressive("get_rows", 5)
+        assert next(rows) == {'row': 0}
+        assert next(rows) == {'row': 1}
+
+
+def test_progressive_results_error(router, row_service):
+    with Client(router=router) as client:
+        rows = client.call.progressive("get_bad_rows")
+        assert next(rows) == {'row': 0}
+
+        with pytest.raises(WampyError):
+            next(rows)
+
+
+def test_generator_result_without_progress(router, row_service):
+    with Client(router=router) as client:
+        rows = client.rpc.get_rows(3)
+
+    assert rows == [{'row': 0}, {'row': 1}, {'row': 2}]
+
+
+def test_identical_calls_are_coalesced(router, slow_service):
+    with Client(router=router, coalesce_calls=True) as client:
+        gthreads = [
+            eventlet.spawn(client.rpc.slow, 0.5) for _ in range(20)
+        ]
+        # a different argument is a different call
+        other = eventlet.spawn(client.rpc.slow, 0.2)
+
+        assert [gthread.wait() for gthread in gthreads] == ["slow"] * 20
+        assert other.wait() == "slow"
+
+        assert sorted(slow_service.finished) == [0.2, 0.5]
+        assert client.session.stats['coalesced_calls'] == 19
+        assert client.calls_in_flight == {}
+
+        # nothing is in flight now, so the next call is made again
+        client.rpc.slow(0.5)
+        assert slow_service.finished.count(0.5) == 2
+
+
+def test_coalesced_calls_share_an_error(router, slow_service):
+    with Client(
+            router=router, coalesce_calls=True, call_timeout=0.2,
+    ) as client:
+        gthreads = [
+            eventlet.spawn(client.rpc.slow, 1) for _ in range(5)
+        ]
+
+        for gthread in gthreads:
+            with pytest.raises(WampyTimeOutError):
+                gthread.wait()
+
+        assert client.session.stats['coalesced_calls'] == 4
+        assert client.calls_in_flight == {}
+
+
+def test_coalesced_calls_when_the_first_is_killed(router, slow_service):
+    with Client(router=router, coalesce_calls=True) as client:
+        first = eventlet.spawn(client.rpc.slow, 1)
+        eventlet.sleep()
+        waiter = eventlet.spawn(client.rpc.slow, 1)
+        eventlet.sleep()
+
+        first.kill()
+
+        with eventlet.Timeout(0.5):
+            with pytest.raises(WampyError):
+                waiter.wait()
+
+        assert client.calls_in_flight == {}
+
+
+def test_coalesced_calls_wait_no_longer_than_the_timeout(
+        router, slow_service,
+):
+    with Client(
+            router=router, coalesce_calls=True, call_timeout=0.2,
+    ) as client:
+        key = call_key("slow", (1,), {})
+        # a call that will never be answered
+        client.calls_in_flight[key] = Event()
+
+        with eventlet.Timeout(1):
+            with pytest.raises(WampyTimeOutError):
+                client.rpc.slow(1)
+
+        assert client.session.stats['coalesced_calls'] == 1
+
+
+def test_progressive_results_stopped_early(router, row_service):
+    with Client(router=router) as client:
+        session = client.session
+
+        rows = client.call.progressive("get_rows", 50)
+        assert next(rows) == {'row': 0}
+        # and the rest of the stream is abandoned
+        rows.close()
+
+        def check_finished():
+            assert session._abandoned_requests == {}
+
+        assert_stops_raising(check_finished)
+
+        # none of it left over for ``recv_message``
+        assert len(session._message_queue) == 0
+
+    # the GOODBYE was answered, and nothing else was taken for it
+    assert len(session._message_queue) == 0
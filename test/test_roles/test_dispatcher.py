@@ -0,0 +1,183 @@
+import eventlet
+import pytest
+
+from wampy.errors import WampyError
+from wampy.peers.clients import Client
+from wampy.roles.subscriber import subscribe
+
+from test.helpers import assert_stops_raising
+
+
+class SlowAndFastSubscriber(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(SlowAndFastSubscriber, self).__init__(*args, **kwargs)
+        self.received = []
+
+    @subscribe(topic="slow", parallelism=1)
+    def slow_handler(self, message, **kwargs):
+        eventlet.sleep(1)
+        self.received.append(("slow", message))
+
+    @subscribe(topic="fast", parallelism=1)
+    def fast_handler(self, message, **kwargs):
+        self.received.append(("fast", message))
+
+
+class PartitionedSubscriber(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(PartitionedSubscriber, self).__init__(*args, **kwargs)
+        self.received = []
+
+    @subscribe(
+        topic="readings", parallelism=4,
+        partition_key=lambda **kwargs: kwargs['sensor'],
+    )
+    def readings_handler(self, sensor, value, **kwargs):
+        # yield to the hub so that the lanes interleave
+        eventlet.sleep(0.01 * (sensor % 3))
+        self.received.append((sensor, value))
+
+
+@pytest.yield_fixture
+def publisher(router):
+    with Client(router=router) as client:
+        yield client
+
+
+def test_slow_handler_does_not_block_other_topics(router, publisher):
+    subscriber = SlowAndFastSubscriber(router=router)
+
+    with subscriber:
+        publisher.publish(topic="slow", message="tortoise")
+        publisher.publish(topic="fast", message="hare")
+
+        def check_received():
+            assert subscriber.received == [
+                ("fast", "hare"), ("slow", "tortoise"),
+            ]
+
+        assert_stops_raising(check_received)
+
+
+def test_order_is_kept_within_a_partition(router, publisher):
+    subscriber = PartitionedSubscriber(router=router)
+
+    with subscriber:
+        for value in range(10):
+            for sensor in range(6):
+                publisher.publish(topic="readings", sensor=sensor, value=value)
+
+        def check_received():
+            assert len(subscriber.received) == 60
+
+        assert_stops_raising(check_received)
+
+    for sensor in range(6):
+        values = [v for s, v in subscriber.received if s == sensor]
+        assert values == range(10)
+
+
+class BatchingSubscriber(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(BatchingSubscriber, self).__init__(*args, **kwargs)
+        self.batches = []
+
+    @subscribe(topic="ticks", batch_size=10, linger_ms=50)
+    def ticks_handler(self, events):
+        self.batches.append(events)
+
+
+def test_events_are_handled_in_batches(router, publisher):
+    subscriber = BatchingSubscriber(router=router)
+
+    with subscriber:
+        for price in range(25):
+            publisher.publish(topic="ticks", price=price)
+
+        def check_received():
+            assert sum(len(batch) for batch in subscriber.batches) == 25
+
+        assert_stops_raising(check_received)
+
+    # full batches, then what was left once the linger ran out
+    assert all(len(batch) <= 10 for batch in subscriber.batches)
+    assert len(subscriber.batches) < 25
+
+    events = [event for batch in subscriber.batches for event in batch]
+    assert [event['price'] for event in events] == range(25)
+    assert events[0]['_meta']['topic'] == "ticks"
+
+
+def test_batched_handler_subscribed_while_running(router, publisher):
+    batches = []
+
+    with Client(router=router) as subscriber:
+        subscriber.subscribe(
+            "ticks", batches.append, batch_size=100, linger_ms=50)
+
+        publisher.publish(topic="ticks", price=1)
+        publisher.publish(topic="ticks", price=2)
+
+        def check_received():
+            assert [
+                [event['price'] for event in batch] for batch in batches
+            ] == [[1, 2]]
+
+        assert_stops_raising(check_received)
+
+
+def test_batched_handler_cannot_be_parallel(router):
+    with Client(router=router) as subscriber:
+        with pytest.raises(WampyError):
+            subscriber.subscribe(
+                "ticks", lambda events: None, batch_size=10, parallelism=2)
+
+
+class Dashboard(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(Dashboard, self).__init__(*args, **kwargs)
+        self.rendered = []
+
+    @subscribe(
+        topic="prices", conflate=True, key=lambda **kwargs: kwargs['symbol'],
+    )
+    def prices_handler(self, symbol, price, **kwargs):
+        # slow to render, so prices tick faster than they are shown
+        eventlet.sleep(0.5)
+        self.rendered.append((symbol, price))
+
+
+def test_busy_handler_gets_the_latest_event_per_key(router, publisher):
+    dashboard = Dashboard(router=router)
+
+    with dashboard:
+        for price in range(10):
+            publisher.publish(topic="prices", symbol="ABC", price=price)
+            publisher.publish(topic="prices", symbol="XYZ", price=price)
+
+        def check_rendered():
+            assert ("ABC", 9) in dashboard.rendered
+            assert ("XYZ", 9) in dashboard.rendered
+
+        assert_stops_raising(check_rendered, timeout=10)
+
+        conflated = dashboard.session.stats['conflated_events']
+
+    # nothing is handled twice, and most of it not at all
+    assert len(dashboard.rendered) + conflated == 20
+    assert len(dashboard.rendered) < 20
+
+    for symbol in ("ABC", "XYZ"):
+        prices = [p for s, p in dashboard.rendered if s == symbol]
+        assert prices == sorted(prices)
+
+
+def test_conflated_handler_cannot_be_batched(router):
+    with Client(router=router) as subscriber:
+        with pytest.raises(WampyError):
+            subscriber.subscribe(
+                "prices", lambda events: None, conflate=True, batch_size=10)
@@ -0,0 +1,223 @@
+import os
+from time import time as now
+
+import eventlet
+import pytest
+from eventlet.patcher import original
+
+from wampy.errors import WampyError
+from wampy.messages import Message
+from wampy.peers.clients import Client
+from wampy.peers.routers import Crossbar
+from wampy.roles.callee import register_rpc
+from wampy.roles.executors import (
+    BatchExecutor, ProcessExecutor, pack, unpack,
+)
+from wampy.roles.subscriber import subscribe
+
+from test.helpers import assert_stops_raising
+
+# a real, blocking sleep - standing in for a driver call which releases
+# the GIL but knows nothing of eventlet
+blocking_sleep = original('time').sleep
+
+
+class NumberCruncher(Client):
+
+    @register_rpc(executor="process", workers=2)
+    def get_pid(self):
+        return os.getpid()
+
+    @register_rpc(executor="process", workers=2)
+    def total(self, numbers):
+        return sum(numbers)
+
+    @register_rpc(executor="process", workers=1)
+    def divide(self, numerator, denominator):
+        return numerator / denominator
+
+
+class BlockingService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(BlockingService, self).__init__(*args, **kwargs)
+        self.events = []
+
+    @register_rpc(executor="thread")
+    def query_database(self):
+        blocking_sleep(2)
+        return "rows"
+
+    @register_rpc
+    def ping(self):
+        return "pong"
+
+    @subscribe(topic="reports", executor="thread")
+    def build_report(self, name, **kwargs):
+        blocking_sleep(1)
+        self.events.append(name)
+
+
+@pytest.yield_fixture
+def executor():
+    executor = ProcessExecutor(workers=2, shared_memory_threshold=1024)
+    executor.start()
+    yield executor
+    executor.stop()
+
+
+def test_pack_large_payloads_into_shared_memory():
+    shared, data = pack(range(10), threshold=1024)
+    assert shared is False
+    assert unpack(shared, data) == range(10)
+
+    shared, path = pack(range(10000), threshold=1024)
+    assert shared is True
+    assert os.path.exists(path)
+    assert unpack(shared, path) == range(10000)
+    assert not os.path.exists(path)
+
+
+def test_execute_in_worker_process(executor):
+    cruncher = NumberCruncher(router=Crossbar())
+
+    pid = executor.execute(cruncher.get_pid, (), {})
+    assert pid != os.getpid()
+
+    # large enough to travel through shared memory
+    numbers = range(10000)
+    assert executor.execute(cruncher.total, (numbers,), {}) == sum(numbers)
+
+    with pytest.raises(WampyError):
+        executor.execute(cruncher.divide, (1, 0), {})
+
+
+def test_call_procedure_executed_in_process_pool(router):
+    with NumberCruncher(router=router):
+        with Client(router=router) as client:
+            assert client.rpc.get_pid() != os.getpid()
+            assert client.rpc.total(numbers=[1, 2, 3]) == 6
+            assert client.rpc.divide(10, 2) == 5
+
+
+def test_blocking_procedure_does_not_freeze_the_session(router):
+    with BlockingService(router=router):
+        slow_caller = Client(router=router)
+        fast_caller = Client(router=router)
+
+        with slow_caller:
+            with fast_caller:
+                start = now()
+                query = eventlet.spawn(slow_caller.rpc.query_database)
+                # give the blocking procedure time to start
+                eventlet.sleep(0.5)
+
+                assert fast_caller.rpc.ping() == "pong"
+                assert now() - start < 1.5
+
+                assert query.wait() == "rows"
+
+
+def test_blocking_handler_does_not_freeze_the_session(router):
+    with BlockingService(router=router) as service:
+        with Client(router=router) as client:
+            start = now()
+            client.publish(topic="reports", name="first")
+            client.publish(topic="reports", name="second")
+            eventlet.sleep(0.5)
+
+            assert client.rpc.ping() == "pong"
+            assert now() - start < 1.5
+
+            def check_events():
+                assert service.events == ["first", "second"]
+
+            assert_stops_raising(check_events)
+
+
+class ModelService(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(ModelService, self).__init__(*args, **kwargs)
+        self.batches = []
+
+    @register_rpc(batch=True, max_batch=8, max_wait_ms=50)
+    def double(self, numbers):
+        self.batches.append(numbers)
+        return [number * 2 for number in numbers]
+
+    @register_rpc(batch=True, executor="thread")
+    def negate(self, numbers):
+        return [-number for number in numbers]
+
+    @register_rpc(batch=True)
+    def broken(self, numbers):
+        return numbers[:-1]
+
+
+@pytest.yield_fixture
+def model_service(router):
+    with ModelService(router=router) as service:
+        yield service
+
+
+def test_concurrent_invocations_are_batched(router, model_service):
+    with Client(router=router) as caller:
+        gthreads = [
+            eventlet.spawn(caller.rpc.double, number)
+            for number in range(20)
+        ]
+        results = [gthread.wait() for gthread in gthreads]
+
+    # each caller has the result of its own argument
+    assert results == [number * 2 for number in range(20)]
+
+    batch_sizes = [len(batch) for batch in model_service.batches]
+    assert sum(batch_sizes) == 20
+    assert len(batch_sizes) < 20
+    assert max(batch_sizes) <= 8
+
+
+def test_batch_on_an_executor(router, model_service):
+    with Client(router=router) as caller:
+        gthreads = [
+            eventlet.spawn(caller.rpc.negate, number) for number in range(5)
+        ]
+        assert [gthread.wait() for gthread in gthreads] == [
+            0, -1, -2, -3, -4]
+
+
+def test_stopping_fails_the_batch_in_hand():
+    executor = BatchExecutor(max_wait_ms=0)
+    executor.start()
+
+    def endless(numbers):
+        eventlet.sleep(10)
+
+    gthreads = [
+        eventlet.spawn(executor.execute, endless, [number], {})
+        for number in range(3)
+    ]
+    # the batch is taken from the queue and is running
+    eventlet.sleep(0.01)
+
+    executor.stop()
+
+    with eventlet.Timeout(1):
+        for gthread in gthreads:
+            with pytest.raises(WampyError):
+                gthread.wait()
+
+
+def test_failed_batch_answers_every_invocation(router, model_service):
+    with Client(router=router) as caller:
+        pendings = [
+            caller.send_call("broken", args=[number]) for number in range(3)
+        ]
+        # as well as the wrong number of arguments
+        pendings.append(caller.send_call("broken", args=[1, 2]))
+
+        for pending in pendings:
+            response = pending.wait()
+            assert response[0] == Message.RESULT
+            assert response[4]['error']
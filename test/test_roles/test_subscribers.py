@@ -3,8 +3,9 @@ from mock import Mock, call
 from mock import ANY
 
 from wampy.constants import DEFAULT_REALM
+from wampy.errors import WampyError
 from wampy.peers.clients import Client
-from wampy.roles.subscriber import TopicSubscriber
+from wampy.roles.subscriber import TopicSubscriber, subscribe
 
 from test.helpers import assert_stops_raising
 
@@ -36,3 +37,233 @@ class TestTopicSubscriber(object):
             publisher.publish(topic="foo", message="bar")
             publisher.publish(topic="spam", message="ham")
             assert_stops_raising(wait_for_message)
+
+
+class PatternSubscriber(Client):
+
+    def __init__(self, *args, **kwargs):
+        super(PatternSubscriber, self).__init__(*args, **kwargs)
+        self.received = []
+
+    @subscribe(topic="com.acme", match="prefix")
+    def all_acme(self, **kwargs):
+        self.received.append(("all_acme", kwargs['_meta']['topic']))
+
+    @subscribe(topic="com.acme.sensor..reading", match="wildcard")
+    def readings(self, **kwargs):
+        self.received.append(("readings", kwargs['_meta']['topic']))
+
+    @subscribe(topic="com.acme.sensor.1.reading")
+    def sensor_one(self, **kwargs):
+        self.received.append(("sensor_one", kwargs['_meta']['topic']))
+
+
+class TestPatternSubscriptions(object):
+
+    @pytest.yield_fixture
+    def publisher(self, router):
+        with Client(router=router) as client:
+            yield client
+
+    def test_covered_topics_share_a_subscription(self, router):
+        with PatternSubscriber(router=router) as subscriber:
+            # the prefix covers both of the others
+            assert len(subscriber.session.router_subscriptions) == 1
+            assert sorted(subscriber.get_subscription_handler_names()) == [
+                "all_acme", "readings", "sensor_one"]
+
+    def test_handlers_matching_the_concrete_topic(self, router, publisher):
+        with PatternSubscriber(router=router) as subscriber:
+            publisher.publish(topic="com.acme.sensor.1.reading", value=1)
+            publisher.publish(topic="com.acme.sensor.2.reading", value=2)
+            publisher.publish(topic="com.acme.door.open", value=3)
+
+            def wait_for_events():
+                assert sorted(subscriber.received) == sorted([
+                    ("all_acme", "com.acme.sensor.1.reading"),
+                    ("readings", "com.acme.sensor.1.reading"),
+                    ("sensor_one", "com.acme.sensor.1.reading"),
+                    ("all_acme", "com.acme.sensor.2.reading"),
+                    ("readings", "com.acme.sensor.2.reading"),
+                    ("all_acme", "com.acme.door.open"),
+                ])
+
+            assert_stops_raising(wait_for_events)
+            # one EVENT per publication, however many handlers it reached
+            assert subscriber.session.stats['events'] == 3
+
+    def test_topic_subscriber_prefix(self, router, publisher):
+        message_handler = Mock()
+
+        subscriber = TopicSubscriber(
+            router=router, realm=DEFAULT_REALM, topics=["foo"],
+            message_handler=message_handler, match="prefix")
+
+        def wait_for_message():
+            assert message_handler.call_args_list == [
+                call(_meta={
+                    'topic': 'foo.bar', 'subscription_id': ANY},
+                    message=u'spam'),
+            ]
+
+        with subscriber:
+            publisher.publish(topic="foo.bar", message="spam")
+            assert_stops_raising(wait_for_message)
+
+    def test_invalid_match(self):
+        with pytest.raises(WampyError):
+            subscribe(topic="foo", match="regex")
+
+
+class TestDynamicSubscriptions(object):
+
+    @pytest.yield_fixture
+    def publisher(self, router):
+        with Client(router=router) as client:
+            yield client
+
+    def test_handlers_share_a_subscription(self, router, publisher):
+        first, second = Mock(), Mock()
+
+        with Client(router=router) as subscriber:
+            first_subscription = subscriber.subscribe("user.1", first)
+            second_subscription = subscriber.subscribe("user.1", second)
+            assert len(subscriber.subscription_map) == 1
+
+            publisher.publish(topic="user.1", message="hello")
+
+            def wait_for_message():
+                assert first.call_count == 1
+                assert second.call_count == 1
+
+            assert_stops_raising(wait_for_message)
+
+            subscriber.unsubscribe(first_subscription)
+            # the other handler still holds the subscription
+            assert len(subscriber.subscription_map) == 1
+
+            publisher.publish(topic="user.1", message="again")
+
+            def wait_for_another_message():
+                assert second.call_count == 2
+
+            assert_stops_raising(wait_for_another_message)
+            assert first.call_count == 1
+
+            subscriber.unsubscribe(second_subscription)
+            assert subscriber.subscription_map == {}
+            assert subscriber.session.handlers == {}
+            assert subscriber.session.router_subscriptions == {}
+
+            def wait_for_no_subscriptions():
+                assert publisher.get_subscription_lookup(
+                    topic="user.1") is None
+
+            assert_stops_raising(wait_for_no_subscriptions)
+
+    def test_churn(self, router):
+        with Client(router=router) as subscriber:
+            for index in range(50):
+                subscription = subscriber.subscribe(
+                    "user.{}".format(index), Mock())
+                subscriber.unsubscribe(subscription)
+
+            assert subscriber.subscription_map == {}
+            assert len(subscriber.session.topic_trie) == 0
+
+    def test_narrower_handler_left_on_a_pattern(self, router, publisher):
+        everything, sensor = Mock(), Mock()
+
+        with Client(router=router) as subscriber:
+            broad = subscriber.subscribe(
+                "com.acme", everything, match="prefix")
+            subscriber.subscribe("com.acme.sensor", sensor)
+            subscriber.unsubscribe(broad)
+
+            # the subscription to the prefix is kept for the exact topic
+            assert len(subscriber.subscription_map) == 1
+
+            publisher.publish(topic="com.acme.door", message="open")
+            publisher.publish(topic="com.acme.sensor", message="reading")
+
+            def wait_for_message():
+                assert sensor.call_count == 1
+
+            assert_stops_raising(wait_for_message)
+            assert everything.call_count == 0
+            assert subscriber.session.stats['events'] == 2
+
+    def test_unsubscribe_twice(self, router):
+        with Client(router=router) as subscriber:
+            subscription = subscriber.subscribe("foo", Mock())
+            subscriber.unsubscribe(subscription)
+
+            with pytest.raises(WampyError):
+                subscriber.unsubscribe(subscription)
+
+
+class TestStreams(object):
+
+    @pytest.yield_fixture
+    def publisher(self, router):
+        with Client(router=router) as client:
+            yield client
+
+    def test_iterate_over_events(self, router, publisher):
+        received = []
+
+        with Client(router=router) as consumer:
+            with consumer.stream("ticks", maxsize=10) as events:
+                publisher.publish(topic="ticks", price=1)
+                publisher.publish(topic="ticks", price=2)
+
+                for event in events:
+                    received.append(event)
+                    if len(received) == 2:
+                        break
+
+            assert consumer.get_subscription_handler_names() == []
+
+        assert [event['price'] for event in received] == [1, 2]
+        assert received[1]['_meta']['topic'] == "ticks"
+
+    def test_block_loses_nothing(self, router, publisher):
+        with Client(router=router) as consumer:
+            with consumer.stream("ticks", maxsize=2) as events:
+                for price in range(10):
+                    publisher.publish(topic="ticks", price=price)
+
+                prices = [events.get(timeout=5)['price'] for _ in range(10)]
+
+        assert prices == range(10)
+        assert events.dropped == 0
+
+    def test_drop_oldest(self, router, publisher):
+        with Client(router=router) as consumer:
+            with consumer.stream(
+                    "ticks", maxsize=3, overflow="drop_oldest") as events:
+                for price in range(10):
+                    publisher.publish(topic="ticks", price=price)
+
+                def check_dropped():
+                    assert events.dropped == 7
+
+                assert_stops_raising(check_dropped)
+
+                prices = [events.get(timeout=5)['price'] for _ in range(3)]
+
+            assert consumer.session.stats['dropped_events'] == 7
+
+        # only the freshest are kept
+        assert prices == [7, 8, 9]
+
+    def test_closed_stream_ends_the_iteration(self, router):
+        with Client(router=router) as consumer:
+            with consumer.stream("ticks") as events:
+                pass
+
+            assert list(events) == []
+
+    def test_invalid_overflow(self, router):
+        with pytest.raises(WampyError):
+            Client(router=router).stream("ticks", overflow="spill")
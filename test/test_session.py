@@ -1,4 +1,15 @@
+import eventlet
+import pytest
+from mock import Mock, patch
+
+from wampy.errors import WampProtocolError
+from wampy.messages import Message
+from wampy.messages.register import Register
 from wampy.peers.clients import Client
+from wampy.roles.callee import register_procedures
+from wampy.roles.subscriber import subscribe_to_topics
+
+from test.helpers import assert_stops_raising
 
 
 class TestSession:
@@ -49,3 +60,89 @@ class TestSession:
                 'subscription_revocation': True,
             }
         }
+
+
+class TestTables(object):
+
+    @pytest.yield_fixture
+    def client(self, router):
+        with Client(router=router) as client:
+            yield client
+
+    def spy_on_responses(self, session, table):
+        """ Record the size of ``table`` as each response is handled. """
+        sizes = []
+        request_all = session.request_all
+
+        def spying_request_all(messages, timeout=5, on_response=None):
+            def spy(index, response):
+                on_response(index, response)
+                sizes.append(len(table()))
+
+            return request_all(messages, timeout, on_response=spy)
+
+        session.request_all = spying_request_all
+        return sizes
+
+    def test_procedures_are_ready_as_each_is_registered(self, client):
+        session = client.session
+        sizes = self.spy_on_responses(session, lambda: session.procedures)
+
+        client.first = lambda: 1
+        client.second = lambda: 2
+        register_procedures(session, [
+            {'procedure_name': "first"}, {'procedure_name': "second"},
+        ])
+
+        assert sizes == [1, 2]
+
+    def test_handlers_are_ready_as_each_is_subscribed(self, client):
+        session = client.session
+        sizes = self.spy_on_responses(session, lambda: session.handlers)
+
+        subscribe_to_topics(session, [
+            {'topic': "first", 'handler': Mock(), 'name': "first"},
+            {'topic': "second", 'handler': Mock(), 'name': "second"},
+        ])
+
+        assert sizes == [1, 2]
+
+    def test_unknown_ids_are_not_fatal_to_the_reader(self, client):
+        session = client.session
+
+        with patch.object(session, 'send_message') as send_message:
+            # neither raises
+            session.message_handler(
+                [Message.EVENT, 123, 456, {}, [], {'spam': 'eggs'}])
+            session.message_handler(
+                [Message.INVOCATION, 789, 123, {}, [], {}])
+
+        error, = [call_args[0][0] for call_args in send_message.call_args_list]
+        assert error.message[:3] == [Message.ERROR, Message.INVOCATION, 789]
+        assert error.message[4] == "wamp.error.no_such_registration"
+
+    def test_late_registration_is_undone(self, router, client):
+        session = client.session
+        message_handler = session.message_handler
+
+        def slow_message_handler(message):
+            eventlet.sleep(0.1)
+            message_handler(message)
+
+        with patch.object(session, 'message_handler', slow_message_handler):
+            # given up on before the Dealer's answer is read
+            response, = session.request_all([Register(procedure="late")], 0)
+            assert response is None
+
+        def check_undone():
+            # the REGISTERED, and then the UNREGISTERED, were dropped
+            assert not session._abandoned_requests
+
+        assert_stops_raising(check_undone)
+        assert len(session._message_queue) == 0
+
+        with Client(router=router) as caller:
+            with pytest.raises(WampProtocolError) as exc_info:
+                caller.rpc.late()
+
+        assert "no callee registered" in str(exc_info.value)
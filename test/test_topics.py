@@ -0,0 +1,82 @@
+import pytest
+
+from wampy.errors import WampyError
+from wampy.topics import (
+    EXACT, PREFIX, WILDCARD, TopicTrie, breadth, covers, topic_matches)
+
+
+class TestTopicTrie(object):
+
+    @pytest.fixture
+    def trie(self):
+        trie = TopicTrie()
+        trie.insert("com.acme.sensor.1.reading", EXACT, "exact")
+        trie.insert("com.acme.sensor", PREFIX, "prefix")
+        trie.insert("com.acme.sensor..reading", WILDCARD, "wildcard")
+        trie.insert("com.acme..1.", WILDCARD, "wide wildcard")
+        return trie
+
+    def test_match(self, trie):
+        assert sorted(trie.match("com.acme.sensor.1.reading")) == [
+            "exact", "prefix", "wide wildcard", "wildcard"]
+        assert sorted(trie.match("com.acme.sensor.2.reading")) == [
+            "prefix", "wildcard"]
+        assert sorted(trie.match("com.acme.sensors")) == ["prefix"]
+        assert trie.match("com.acme.sensor.1") == ["prefix"]
+        assert trie.match("com.acme.door.1.open") == ["wide wildcard"]
+        assert trie.match("org.acme.sensor.1.reading") == []
+
+    def test_remove(self, trie):
+        assert len(trie) == 4
+
+        trie.remove("com.acme.sensor", PREFIX, "prefix")
+        trie.remove("com.acme.sensor.1.reading", EXACT, "exact")
+
+        assert len(trie) == 2
+        assert sorted(trie.match("com.acme.sensor.1.reading")) == [
+            "wide wildcard", "wildcard"]
+
+    def test_invalid_match(self, trie):
+        with pytest.raises(WampyError):
+            trie.insert("com.acme", "regex", "value")
+
+
+def test_covers():
+    assert covers("com.acme", PREFIX, "com.acme.sensor", EXACT)
+    assert covers("com.acme", PREFIX, "com.acme.sensor", PREFIX)
+    assert covers("com.acme", PREFIX, "com.acme..reading", WILDCARD)
+    assert not covers("com.acme.sensor", PREFIX, "com.acme..1", WILDCARD)
+
+    assert covers("com..reading", WILDCARD, "com.acme.reading", EXACT)
+    assert covers("com..", WILDCARD, "com..reading", WILDCARD)
+    assert not covers("com..reading", WILDCARD, "com..", WILDCARD)
+    assert not covers("com..reading", WILDCARD, "com.acme", PREFIX)
+
+    assert covers("com.acme", EXACT, "com.acme", EXACT)
+    assert not covers("com.acme", EXACT, "com.acme", PREFIX)
+
+
+def test_topic_matches():
+    assert topic_matches("com.acme", EXACT, "com.acme")
+    assert not topic_matches("com.acme", EXACT, "com.acme.sensor")
+    assert topic_matches("com.acme", PREFIX, "com.acme.sensor")
+    assert topic_matches("com..sensor", WILDCARD, "com.acme.sensor")
+    assert not topic_matches("com..sensor", WILDCARD, "com.acme.door")
+
+
+def test_breadth_orders_broadest_first():
+    patterns = [
+        ("com.acme.sensor.1", EXACT),
+        ("com..", WILDCARD),
+        ("com.acme.sensor", PREFIX),
+        ("com", PREFIX),
+        ("com.acme.", WILDCARD),
+    ]
+
+    assert sorted(patterns, key=lambda pattern: breadth(*pattern)) == [
+        ("com", PREFIX),
+        ("com.acme.sensor", PREFIX),
+        ("com..", WILDCARD),
+        ("com.acme.", WILDCARD),
+        ("com.acme.sensor.1", EXACT),
+    ]
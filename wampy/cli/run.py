@@ -2,13 +2,17 @@
 
 wampy run module:app
 
+wampy run module:app --workers 4
+
 Largely experimental for now.... sorry.
 
 """
 import os
+import signal
 import sys
 from urlparse import urlparse
 
+from wampy.peers.pools import ServicePool
 from wampy.peers.routers import Crossbar
 
 
@@ -59,13 +63,46 @@ class AppRunner(object):
                 app.stop()
 
 
-def run(app, host, port):
+def run_workers(app_class, router, workers, invocation_policy):
+    """ Fork ``workers`` processes, each with a Session of the app, and
+    supervise them until a SIGTERM or SIGINT, which is passed on to the
+    workers so that they end their Sessions gracefully. """
+    pool = ServicePool(
+        app_class, router=router, sessions=workers, processes=workers,
+        invocation_policy=invocation_policy,
+    )
+
+    print("starting up {} workers....".format(workers))
+    pool.start()
+
+    def handle_signal(signum, frame):
+        pool.stop_supervising()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    print("{} is now running in {} workers and connected to {}.".format(
+        app_class.__name__, workers, router.host))
+
+    pool.supervise()
+
+    print("stopping workers....")
+    pool.terminate()
+
+
+def run(app, host, port, workers=1, invocation_policy="roundrobin"):
     module_name, app_name = app[0].split(':')
     mod = import_module(module_name)
     app_class = getattr(mod, app_name)
 
     # TODO: realm and roles should be passed in too
     router = Crossbar(host=host, port=port)
+
+    if workers > 1:
+        run_workers(app_class, router, workers, invocation_policy)
+        print('disconnected')
+        return
+
     app = app_class(router=router)
 
     runner = AppRunner()
@@ -106,7 +143,10 @@ def main(args):
         # guess!
         host, port = router_url.split(':')
 
-    run(app, host, int(port))
+    run(
+        app, host, int(port), workers=args.workers,
+        invocation_policy=args.invocation_policy,
+    )
 
 
 def init_parser(parser):
@@ -119,4 +159,12 @@ def init_parser(parser):
         '--router', default='http://localhost:8080',
         help='WAMP router url')
 
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help='number of worker processes to fork, each with a session')
+
+    parser.add_argument(
+        '--invocation-policy', default='roundrobin',
+        help='invocation policy shared by the workers\' procedures')
+
     return parser
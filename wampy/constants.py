@@ -21,9 +21,62 @@ DEFAULT_ROLES = {
         'publisher': {},
         'callee': {
             'shared_registration': True,
+            'features': {
+                'call_canceling': True,
+                'progressive_call_results': True,
+            },
+        },
+        'caller': {
+            'features': {
+                'call_canceling': True,
+                'call_timeout': True,
+                'progressive_call_results': True,
+            },
         },
-        'caller': {},
     },
 }
 
+# seconds a Caller waits for a RESULT
+DEFAULT_TIMEOUT = 5
+
+# seconds between attempts to reconnect to a Router, see
+# :func:`wampy.session.backoff_delays`
+RECONNECT_INITIAL_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30
+RECONNECT_MULTIPLIER = 2
+# seconds a single reconnection attempt may take, from connecting to
+# restoring the Session, before it is abandoned for the next
+RECONNECT_ATTEMPT_TIMEOUT = 20
+
+# seconds the responses to an abandoned request, e.g. a call that timed
+# out, are looked out for and dropped, and the most requests looked out
+# for at once
+ABANDONED_REQUEST_TTL = 300
+MAX_ABANDONED_REQUESTS = 10000
+
+# seconds a draining Session waits for the work in hand to finish
+DEFAULT_DRAIN_TIMEOUT = 10
+
+# what a full buffer of messages or events does with one more:
+# the producer waits for the consumer to make room
+BLOCK = "block"
+# the oldest waiting is dropped to make room
+DROP_OLDEST = "drop_oldest"
+# the new one is dropped
+DROP_NEWEST = "drop_newest"
+
+# the messages received that nobody is waiting on, such as a GOODBYE,
+# are kept up to a number and a total size in bytes, see
+# :class:`wampy.queues.InboundQueue`
+DEFAULT_INBOUND_QUEUE_SIZE = 1000
+DEFAULT_INBOUND_QUEUE_BYTES = 16 * 1024 * 1024
+
+# bytes of publications waiting to be sent at which publishers are made
+# to wait, and at which they carry on, see
+# :class:`wampy.queues.OutboundScheduler`
+DEFAULT_SEND_HIGH_WATER = 4 * 1024 * 1024
+DEFAULT_SEND_LOW_WATER = 1024 * 1024
+# seconds an ending Session waits for its publications to be sent
+DEFAULT_FLUSH_TIMEOUT = 5
+
 SUBSCRIBER = "subscriber"
@@ -36,3 +36,7 @@ class WampError(Exception):
 
 class WampyError(Exception):
     pass
+
+
+class WampyTimeOutError(Exception):
+    pass
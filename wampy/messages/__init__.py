@@ -1,9 +1,11 @@
 from . authenticate import Authenticate
 from . call import Call
+from . cancel import Cancel
 from . error import Error
 from . event import Event
 from . hello import Hello
 from . challenge import Challenge
+from . interrupt import Interrupt
 from . invocation import Invocation
 from . goodbye import Goodbye
 from . message import Message
@@ -13,13 +15,19 @@ from . registered import Registered
 from . result import Result
 from . subscribe import Subscribe
 from . subscribed import Subscribed
+from . unregister import Unregister
+from . unregistered import Unregistered
+from . unsubscribe import Unsubscribe
+from . unsubscribed import Unsubscribed
 from . yield_ import Yield
 from . welcome import Welcome
 
 
 __all__ = [
-    Authenticate, Call, Error, Event, Goodbye, Hello, Challenge, Invocation, Message, Publish,
-    Register, Registered, Result, Subscribe, Subscribed, Welcome, Yield
+    Authenticate, Call, Cancel, Error, Event, Goodbye, Hello, Challenge,
+    Interrupt, Invocation, Message, Publish, Register, Registered, Result,
+    Subscribe, Subscribed, Unregister, Unregistered, Unsubscribe,
+    Unsubscribed, Welcome, Yield
 ]
 
 
@@ -34,13 +42,17 @@ MESSAGE_TYPE_MAP = {
     16: 'PUBLISH',
     32: 'SUBSCRIBE',
     33: 'SUBSCRIBED',
+    34: 'UNSUBSCRIBE',
+    35: 'UNSUBSCRIBED',
     36: 'EVENT',
     48: 'CALL',
+    49: 'CANCEL',
     50: 'RESULT',
     64: 'REGISTER',
     65: 'REGISTERED',
     66: 'UNREGISTER',
     67: 'UNREGISTERED',
     68: 'INVOCATION',
+    69: 'INTERRUPT',
     70: 'YIELD',
 }
@@ -0,0 +1,29 @@
+from wampy.messages.message import Message
+
+
+class Cancel(Message):
+    """ When a Caller no longer wants the result of a call it sends a
+    "CANCEL" message to the Dealer.
+
+    Message is of the format
+    ``[CANCEL, CALL.Request|id, Options|dict]``, e.g. ::
+
+        [
+            CANCEL, 10001, {"mode": "killnowait"}
+        ]
+
+    "mode" is one of "skip", "kill" or "killnowait" and tells the Dealer
+    whether the Callee should be interrupted and if a response from it
+    should be awaited.
+
+    """
+    WAMP_CODE = 49
+
+    def __init__(self, request_id, options=None):
+        super(Cancel, self).__init__()
+
+        self.request_id = request_id
+        self.options = options or {}
+        self.message = [
+            Message.CANCEL, self.request_id, self.options,
+        ]
@@ -7,11 +7,45 @@ logger = logging.getLogger('wampy.messages.error')
 
 
 class Error(Message):
+    """ Sent by a Peer when a request fails.
+
+    Message is of the format ::
+
+        [ERROR, REQUEST.Type|int, REQUEST.Request|id, Details|dict,
+         Error|uri]
+
+            or
+
+        [ERROR, REQUEST.Type|int, REQUEST.Request|id, Details|dict,
+         Error|uri, Arguments|list]
+
+            or
+
+        [ERROR, REQUEST.Type|int, REQUEST.Request|id, Details|dict,
+         Error|uri, Arguments|list, ArgumentsKw|dict]
+
+    """
     WAMP_CODE = 8
 
-    def __init__(self, wamp_code, *args, **kwargs):
+    def __init__(
+            self, wamp_code, request_type, request_id, details=None,
+            error=None, args_list=None, kwargs_dict=None,
+    ):
         assert wamp_code == self.WAMP_CODE
+        super(Error, self).__init__()
+
+        self.request_type = request_type
+        self.request_id = request_id
+        self.details = details or {}
+        self.error = error
+        self.args_list = args_list or []
+        self.kwargs_dict = kwargs_dict or {}
+
+        self.message = [
+            self.WAMP_CODE, self.request_type, self.request_id,
+            self.details, self.error, self.args_list, self.kwargs_dict,
+        ]
 
     def process(self, message, client=None):
-        _, _, _, _, _, errors = message
+        errors = message[5] if len(message) > 5 else message[4]
         logger.error(errors)
@@ -1,6 +1,36 @@
-from wampy.errors import WampError
+import logging
+
 from wampy.messages.message import Message
 
+logger = logging.getLogger('wampy.messagehandler')
+
+
+def call_handler(
+        session, subscription_id, topic, entry, payload_list, payload_dict,
+):
+    """ Hand an event to one of the Session's subscription handlers. """
+    func, _, _, _, dispatcher = entry
+
+    # each handler is given a payload of its own to keep
+    kwargs = dict(payload_dict)
+    kwargs['_meta'] = {
+        'topic': topic,
+        'subscription_id': subscription_id,
+    }
+
+    if dispatcher is None:
+        session.running_handlers += 1
+        try:
+            func(*payload_list, **kwargs)
+        except Exception:
+            # as in a dispatcher's lane, the handler's failure is its
+            # own and not the connection's
+            logger.exception('handler "%s" failed on "%s"', func, topic)
+        finally:
+            session.running_handlers -= 1
+    else:
+        dispatcher.dispatch(func, payload_list, kwargs)
+
 
 class Event(Message):
     """ When a Subscriber_is deemed to be a receiver, the Broker sends
@@ -77,16 +107,28 @@ class Event(Message):
                 # ]
                 _, subscription_id, _, details = message
 
-        func_name, topic = session.subscription_map[subscription_id]
-        try:
-            func = getattr(client, func_name)
-        except AttributeError:
-            raise WampError(
-                "Event handler not found: {}".format(func_name)
+        if session.draining:
+            session.stats['events_dropped_draining'] += 1
+            return
+
+        if subscription_id not in session.handlers:
+            # e.g. for a subscription just removed, and never at the cost
+            # of the reader
+            logger.warning(
+                "dropped an event for unknown subscription %s",
+                subscription_id,
             )
+            return
 
-        payload_dict['_meta'] = {}
-        payload_dict['_meta']['topic'] = topic
-        payload_dict['_meta']['subscription_id'] = subscription_id
+        session.stats['events'] += 1
 
-        func(*payload_list, **payload_dict)
+        # a pattern-based subscription is told the topic it matched
+        topic = details.get('topic')
+        if topic is None:
+            _, topic = session.subscription_map[subscription_id]
+
+        for entry in session.handlers_for(subscription_id, topic):
+            call_handler(
+                session, subscription_id, topic, entry, payload_list,
+                payload_dict,
+            )
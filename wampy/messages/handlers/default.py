@@ -1,13 +1,19 @@
 import logging
 
-from wampy.messages import MESSAGE_TYPE_MAP
+from wampy.messages import MESSAGE_TYPE_MAP, Message
 from wampy.messages import (
-    Goodbye, Error, Event, Invocation, Registered, Result, Subscribed,
-    Welcome, Yield, Challenge)
+    Goodbye, Error, Event, Interrupt, Invocation, Registered, Result,
+    Subscribed, Unregistered, Unsubscribed, Welcome, Yield, Challenge)
 from wampy.errors import WampyError
 
 logger = logging.getLogger('wampy.messagehandler')
 
+# messages that are dealt with in full as they are processed, and so are
+# not queued for ``recv_message``
+HANDLED_ON_RECEIPT = frozenset([
+    Message.EVENT, Message.INVOCATION, Message.INTERRUPT,
+])
+
 
 class MessageHandler(object):
 
@@ -35,15 +41,19 @@ class MessageHandler(object):
             # Challenge: used for authentication
             # Goodbye: mandatory because GOODBYE is echoed by the Router
             # Registered: a client is likely to be a Callee
+            # Unregistered: as a Callee drains before leaving
             # Invocation: same as above
+            # Interrupt: when a Caller cancels an Invocation
             # Yield: and again
             # Result: a client is likely to be a Caller
             # Error: for debugging clients
             # Subscribed: because a client is likely to be a Subscriber
+            # Unsubscribed: as handlers come and go
             # Event: sames as above
             self.messages_to_handle = [
-                Welcome, Challenge, Goodbye, Registered, Invocation, Yield, Result,
-                Error, Subscribed, Event
+                Welcome, Challenge, Goodbye, Registered, Unregistered,
+                Invocation, Interrupt, Yield, Result, Error, Subscribed,
+                Unsubscribed, Event
             ]
         else:
             for message in messages_to_handle:
@@ -79,4 +89,11 @@ class MessageHandler(object):
         message_obj = message_class(*message)
         message_obj.process(message=message, client=self.client)
 
+        if wamp_code in HANDLED_ON_RECEIPT:
+            return
+
+        if self.session.deliver_response(message):
+            # correlated by request ID and handed to whoever is waiting
+            return
+
         self.message_queue.put(message)
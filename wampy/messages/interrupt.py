@@ -0,0 +1,29 @@
+import logging
+
+from wampy.messages.message import Message
+
+logger = logging.getLogger('wampy.messagehandler')
+
+
+class Interrupt(Message):
+    """ When a Caller cancels a call, the Dealer sends an "INTERRUPT"
+    to the Callee running the invocation ::
+
+       [INTERRUPT, INVOCATION.Request|id, Options|dict]
+
+    """
+    WAMP_CODE = 69
+
+    def __init__(self, wamp_code, request_id, options=None):
+        assert wamp_code == self.WAMP_CODE
+
+        self.request_id = request_id
+        self.options = options or {}
+
+        self.message = [
+            self.WAMP_CODE, self.request_id, self.options,
+        ]
+
+    def process(self, message, client):
+        logger.info("interrupting invocation: %s", self.request_id)
+        client.session.interrupt_invocation(self.request_id)
@@ -1,6 +1,11 @@
+import inspect
 import logging
 
+import eventlet
+
+from wampy.messages.error import Error
 from wampy.messages.message import Message
+from wampy.messages.yield_ import MemoizedYield, Yield
 
 logger = logging.getLogger('wampy.messagehandler')
 
@@ -38,7 +43,12 @@ class Invocation(Message):
             self.details, self.call_args, self.call_kwargs,
         ]
 
-    def process(self, message, client):
+    def process(self, message, client, reply=None):
+        """ Run the invoked procedure on a green thread of its own.
+
+        Each YIELD is sent to the Dealer, unless a ``reply`` callable is
+        given to hand it to instead.
+        """
         session = client.session
 
         args = []
@@ -56,20 +66,75 @@ class Invocation(Message):
                 _, request_id, registration_id, details, args, kwargs = (
                     message)
 
-        registration_id_procedure_name_map = {
-            v: k for k, v in session.registration_map.items()
-        }
-
-        procedure_name = registration_id_procedure_name_map[
+        if registration_id not in session.procedures:
+            # e.g. for a procedure just unregistered, and never at the
+            # cost of the reader
+            logger.warning(
+                "no procedure for registration %s", registration_id)
+            session.send_message(Error(
+                Message.ERROR, Message.INVOCATION, request_id,
+                error="wamp.error.no_such_registration",
+            ))
+            return
+
+        procedure_name, entrypoint, executor, memo = session.procedures[
             registration_id]
+        session.stats['invocations'] += 1
+        reply = reply or session.send_message
 
-        entrypoint = getattr(client, procedure_name)
+        key = None
+        if memo is not None and not details.get('receive_progress'):
+            try:
+                key = memo.key(args, kwargs)
+                memoized = memo.get(key)
+            except Exception:
+                logger.exception(
+                    "cannot memoize %s with %s, %s",
+                    procedure_name, args, kwargs,
+                )
+                key = memoized = None
+
+            if memoized is not None:
+                # answered straight from the reader, as there is nothing
+                # to compute and next to nothing to encode
+                session.stats['memo_hits'] += 1
+                reply(MemoizedYield(request_id, *memoized))
+                return
+
+            session.stats['memo_misses'] += 1
+
+        # invocations run on green threads of their own so that the reader
+        # carries on, e.g. to receive an INTERRUPT for a running invocation
+        gthread = eventlet.spawn(
+            self._invoke, client, request_id, procedure_name, entrypoint,
+            args, kwargs, details, executor, reply, memo, key,
+        )
+        session.running_invocations[request_id] = gthread
+
+    def _invoke(
+            self, client, request_id, procedure_name, entrypoint, args,
+            kwargs, details, executor, reply, memo=None, key=None,
+    ):
+        session = client.session
+        streamed = False
 
         try:
-            resp = entrypoint(*args, **kwargs)
+            if executor is None:
+                resp = entrypoint(*args, **kwargs)
+            else:
+                resp = executor.execute(entrypoint, args, kwargs)
+
+            if inspect.isgenerator(resp):
+                if details.get('receive_progress'):
+                    self._yield_progress(request_id, resp, reply)
+                    resp = None
+                    streamed = True
+                else:
+                    resp = list(resp)
         except Exception as exc:
             resp = None
             error = str(exc)
+            session.stats['invocation_errors'] += 1
         else:
             error = None
 
@@ -82,13 +147,33 @@ class Invocation(Message):
         result_kwargs['_meta']['session_id'] = session.id
         result_kwargs['_meta']['client_id'] = client.id
 
-        result_args = [resp]
+        # the final YIELD of a progressive result carries no result
+        result_args = [] if streamed else [resp]
+
+        if key is not None and error is None and not streamed:
+            encoded_tail = MemoizedYield.encode_tail(
+                result_args, result_kwargs)
+            memo.put(key, (result_args, result_kwargs, encoded_tail))
+            yield_message = MemoizedYield(
+                request_id, result_args, result_kwargs, encoded_tail)
+        else:
+            yield_message = Yield(
+                request_id,
+                result_args=result_args,
+                result_kwargs=result_kwargs,
+            )
+        if session.running_invocations.pop(request_id, None) is None:
+            # interrupted whilst an executor was finishing the work
+            return
 
-        from wampy.messages import Yield
-        yield_message = Yield(
-            request_id,
-            result_args=result_args,
-            result_kwargs=result_kwargs,
-        )
         logger.info("yielding response: %s", yield_message)
-        session.send_message(yield_message)
+        reply(yield_message)
+
+    def _yield_progress(self, request_id, chunks, reply):
+        # each chunk is sent as it is generated, so a large result is
+        # never held in memory whole
+        for chunk in chunks:
+            yield_message = Yield(
+                request_id, options={'progress': True}, result_args=[chunk],
+            )
+            reply(yield_message)
@@ -16,6 +16,7 @@ class Message(object):
     WELCOME = 2
     ABORT = 3
     CHALLENGE = 4
+    AUTHENTICATE = 5
     GOODBYE = 6
 
     ERROR = 8
@@ -23,6 +24,8 @@ class Message(object):
     PUBLISH = 16
     SUBSCRIBE = 32
     SUBSCRIBED = 33
+    UNSUBSCRIBE = 34
+    UNSUBSCRIBED = 35
     EVENT = 36
 
     REGISTER = 64
@@ -30,10 +33,12 @@ class Message(object):
     UNREGISTER = 66
     UNREGISTERED = 67
     INVOCATION = 68
+    INTERRUPT = 69
 
     RESULT = 50
 
     CALL = 48
+    CANCEL = 49
     YIELD = 70
 
     def __init__(self):
@@ -13,14 +13,20 @@ class Subscribe(Message):
             32, 713845233, {}, "com.myapp.mytopic1"
         ]
 
+    or, to subscribe to a pattern of topics, e.g. ::
+
+        [
+            32, 713845233, {"match": "prefix"}, "com.myapp"
+        ]
+
     """
     WAMP_CODE = 32
 
-    def __init__(self, topic):
+    def __init__(self, topic, options=None):
         super(Subscribe, self).__init__()
 
         self.topic = topic
-        self.options = {}
+        self.options = options or {}
         self.request_id = random.getrandbits(32)
         self.message = [
             self.WAMP_CODE, self.request_id, self.options, self.topic
@@ -0,0 +1,27 @@
+import random
+
+from wampy.messages.message import Message
+
+
+class Unregister(Message):
+    """ A Callee withdraws a procedure it registered with a Dealer by
+    sending an "UNREGISTER" message.
+
+    Message is of the format
+    ``[UNREGISTER, Request|id, REGISTERED.Registration|id]``, e.g. ::
+
+        [
+            UNREGISTER, 788923562, 2103333224
+        ]
+
+    """
+    WAMP_CODE = 66
+
+    def __init__(self, registration_id):
+        super(Unregister, self).__init__()
+
+        self.registration_id = registration_id
+        self.request_id = random.getrandbits(32)
+        self.message = [
+            Message.UNREGISTER, self.request_id, self.registration_id,
+        ]
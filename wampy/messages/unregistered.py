@@ -0,0 +1,16 @@
+from wampy.messages.message import Message
+
+
+class Unregistered(Message):
+    """ [UNREGISTERED, UNREGISTER.Request|id]
+    """
+    WAMP_CODE = 67
+
+    def __init__(self, wamp_code, request_id):
+        assert wamp_code == self.WAMP_CODE
+
+        self.request_id = request_id
+
+        self.message = [
+            self.WAMP_CODE, self.request_id,
+        ]
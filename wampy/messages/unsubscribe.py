@@ -0,0 +1,27 @@
+import random
+
+from wampy.messages.message import Message
+
+
+class Unsubscribe(Message):
+    """ A Subscriber withdraws a subscription it made with a Broker by
+    sending an "UNSUBSCRIBE" message.
+
+    Message is of the format
+    ``[UNSUBSCRIBE, Request|id, SUBSCRIBED.Subscription|id]``, e.g. ::
+
+        [
+            UNSUBSCRIBE, 85346237, 5512315355
+        ]
+
+    """
+    WAMP_CODE = 34
+
+    def __init__(self, subscription_id):
+        super(Unsubscribe, self).__init__()
+
+        self.subscription_id = subscription_id
+        self.request_id = random.getrandbits(32)
+        self.message = [
+            Message.UNSUBSCRIBE, self.request_id, self.subscription_id,
+        ]
@@ -1,3 +1,5 @@
+import json
+
 from wampy.messages.message import Message
 
 
@@ -42,3 +44,39 @@ class Yield(Message):
             Message.YIELD, self.invocation_request_id, self.options,
             self.result_args, self.result_kwargs
         ]
+
+
+class MemoizedYield(Yield):
+    """ A YIELD of a result that has been encoded before, so that only
+    the request ID is left to serialize.
+
+    The ``encoded_tail`` is what follows the request ID in the
+    serialized message, as made by :meth:`encode_tail`.
+
+    """
+
+    def __init__(
+            self, invocation_request_id, result_args, result_kwargs,
+            encoded_tail,
+    ):
+        super(MemoizedYield, self).__init__(
+            invocation_request_id, result_args=result_args,
+            result_kwargs=result_kwargs,
+        )
+        self.encoded_tail = encoded_tail
+
+    @classmethod
+    def encode_tail(cls, result_args, result_kwargs, options=None):
+        # the message less its code and request ID, and without the
+        # opening bracket of the list
+        tail = Yield(
+            None, options=options, result_args=result_args,
+            result_kwargs=result_kwargs,
+        ).message[2:]
+        return json.dumps(
+            tail, separators=(',', ':'), ensure_ascii=False)[1:]
+
+    def serialize(self):
+        self.serialized = True
+        return u'[{},{},{}'.format(
+            self.WAMP_CODE, self.invocation_request_id, self.encoded_tail)
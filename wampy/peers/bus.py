@@ -0,0 +1,152 @@
+import logging
+from uuid import uuid4
+
+import eventlet
+
+from wampy.messages.event import call_handler
+from wampy.messages.invocation import Invocation
+from wampy.messages.message import Message
+
+logger = logging.getLogger('wampy.bus')
+
+
+class LocalBus(object):
+    """ Short-circuits calls and publications between Clients running in
+    the same process.
+
+    Clients created with the same ``local_bus`` are attached to it for as
+    long as they run. A call to a procedure that one of them has
+    registered is invoked on it directly, and an event is handed
+    straight to the handlers of any of them subscribed to its topic. No
+    message is serialized and payloads are passed by reference rather
+    than copied, so handlers and procedures must not mutate what they are
+    given.
+
+    Everything else still goes via the Router. Publications are always
+    sent to it for remote Subscribers, excluding the Sessions already
+    reached here, as the Broker allows.
+
+    """
+
+    def __init__(self):
+        self.clients = []
+        # cycles through the Clients of a procedure registered more than
+        # once in the process
+        self._next_callee = {}
+
+    def attach(self, client):
+        if client not in self.clients:
+            self.clients.append(client)
+
+    def detach(self, client):
+        if client in self.clients:
+            self.clients.remove(client)
+
+    def callee(self, procedure):
+        """ A running Client with ``procedure`` registered, else
+        ``None``. """
+        callees = [
+            client for client in self.clients
+            if procedure in client.session.registration_map and
+            client.session.connected
+        ]
+        if not callees:
+            return None
+
+        index = self._next_callee.get(procedure, 0) % len(callees)
+        self._next_callee[procedure] = index + 1
+        return callees[index]
+
+    def invoke(
+            self, callee, request_id, procedure, args=None, kwargs=None,
+            receive_progress=False,
+    ):
+        """ Invoke ``procedure`` on the ``callee`` as its Dealer would.
+
+        Returns the ID of the invocation, to :meth:`interrupt` it with,
+        and the queue that each RESULT is put on, exactly as the Dealer
+        would have sent them.
+        """
+        session = callee.session
+        registration_id = session.registration_map[procedure]
+
+        details = {}
+        if receive_progress:
+            details['receive_progress'] = True
+
+        responses = eventlet.Queue()
+        # never mistaken for the ID of an INVOCATION from the Dealer, as
+        # an INTERRUPT for one of those must not stop this
+        invocation_id = "local:{}".format(uuid4())
+
+        def reply(yield_message):
+            # [YIELD, INVOCATION.Request|id, Options|dict, Arguments|list,
+            #  ArgumentsKw|dict]
+            _, _, options, result_args, result_kwargs = yield_message.message
+            result_details = {}
+            if options.get('progress'):
+                result_details['progress'] = True
+
+            responses.put([
+                Message.RESULT, request_id, result_details, result_args,
+                result_kwargs,
+            ])
+
+        message = [
+            Message.INVOCATION, invocation_id, registration_id, details,
+            list(args or []), dict(kwargs or {}),
+        ]
+        Invocation(*message).process(message, callee, reply=reply)
+
+        return invocation_id, responses
+
+    def interrupt(self, callee, invocation_id, request_id, responses):
+        """ Stop an invocation made by :meth:`invoke`, answering the call
+        with an ERROR as the Dealer would.
+
+        Nothing is sent to the Router, which never knew of the
+        invocation.
+        """
+        gthread = callee.session.running_invocations.pop(invocation_id, None)
+        if gthread is None:
+            return
+
+        gthread.kill()
+        responses.put([
+            Message.ERROR, Message.CALL, request_id, {},
+            "wamp.error.canceled",
+        ])
+
+    def publish(self, publisher, topic, args=None, kwargs=None):
+        """ Hand the event to the handlers of every other attached Client
+        subscribed to ``topic``.
+
+        Returns the IDs of the Sessions that were reached, for the
+        Broker to exclude.
+        """
+        args = list(args or [])
+        kwargs = kwargs or {}
+
+        reached = []
+        for client in self.clients:
+            session = client.session
+            # as a Broker, never back to the publisher itself, and not to
+            # a Session that is draining
+            if (client is publisher or not session.connected or
+                    session.draining):
+                continue
+
+            matches = session.topic_trie.match(topic)
+            if not matches:
+                continue
+
+            session.stats['local_events'] += 1
+            reached.append(session.id)
+
+            for subscription_id, entry in matches:
+                # the handler's failure is not the publisher's, and is
+                # logged by ``call_handler``
+                call_handler(
+                    session, subscription_id, topic, entry, args, kwargs)
+
+        return reached
@@ -3,12 +3,18 @@ import inspect
 from uuid import uuid4
 
 
-from wampy.constants import DEFAULT_REALM, DEFAULT_ROLES
+from wampy.constants import (
+    DEFAULT_DRAIN_TIMEOUT, DEFAULT_REALM, DEFAULT_ROLES,
+    DEFAULT_SEND_HIGH_WATER, DEFAULT_SEND_LOW_WATER, DEFAULT_TIMEOUT)
 from wampy.session import session_builder
-from wampy.roles.callee import register_rpc, register_procedure
-from wampy.roles.caller import CallProxy, RpcProxy
+from wampy.roles.callee import register_rpc, register_procedures
+from wampy.roles.caller import CallProxy, PendingCall, RpcProxy
 from wampy.roles.publisher import PublishProxy
-from wampy.roles.subscriber import subscribe_to_topic
+from wampy.roles.dispatcher import DEFAULT_LINGER_MS, DEFAULT_MAX_QUEUE_SIZE
+from wampy.roles.stream import BLOCK, EventStream
+from wampy.roles.subscriber import (
+    Subscription, subscribe_to_topics, unsubscribe_from_topic)
+from wampy.topics import EXACT
 
 
 logger = logging.getLogger("wampy.clients")
@@ -20,16 +26,37 @@ class Client(object):
 
     def __init__(
             self, router, roles=DEFAULT_ROLES, realm=DEFAULT_REALM,
-            transport="ws", message_handler=None, id=None, onchallenge=None
+            transport="ws", message_handler=None, id=None, onchallenge=None,
+            call_timeout=DEFAULT_TIMEOUT, reconnect=False,
+            invocation_policy=None, local_bus=None, result_cache=None,
+            coalesce_calls=False, inbound_queue=None,
+            send_high_water=DEFAULT_SEND_HIGH_WATER,
+            send_low_water=DEFAULT_SEND_LOW_WATER,
     ):
         self.roles = roles
         self.realm = realm
         self.router = router
         self.transport = transport
+        self.call_timeout = call_timeout
+        # overrides the invocation policy of every procedure registered,
+        # e.g. "roundrobin" when many instances of a service run at once
+        self.invocation_policy = invocation_policy
+        # a :class:`wampy.peers.bus.LocalBus` shared with other Clients in
+        # this process, to call and publish to them directly
+        self.local_bus = local_bus
+        # a :class:`wampy.roles.cache.ResultCache` for the answers of
+        # procedures that rarely change
+        self.result_cache = result_cache
+        # collapse identical concurrent calls into one, keyed on the
+        # procedure and arguments of the calls in flight
+        self.coalesce_calls = coalesce_calls
+        self.calls_in_flight = {}
         self.session = session_builder(
             client=self, router=self.router, realm=self.realm,
             transport=self.transport, message_handler=message_handler,
-            onchallenge=onchallenge)
+            onchallenge=onchallenge, reconnect=reconnect,
+            inbound_queue=inbound_queue, send_high_water=send_high_water,
+            send_low_water=send_low_water)
 
         self.id = id or str(uuid4())
 
@@ -57,10 +84,25 @@ class Client(object):
     def start(self):
         self.begin_session()
         self.register_roles()
+        if self.result_cache is not None:
+            for topic in self.result_cache.invalidation_topics:
+                self.subscribe(
+                    topic, self.result_cache.invalidation_handler(topic))
+        if self.local_bus is not None:
+            self.local_bus.attach(self)
 
     def stop(self):
+        if self.local_bus is not None:
+            self.local_bus.detach(self)
         self.end_session()
 
+    def drain(self, timeout=DEFAULT_DRAIN_TIMEOUT):
+        """ Leave gracefully: unregister every procedure, give running
+        invocations and event handlers up to ``timeout`` seconds to
+        finish, and only then end the Session. """
+        self.session.drain(timeout=timeout)
+        self.stop()
+
     def send_message(self, message):
         self.session.send_message(message)
 
@@ -71,47 +113,184 @@ class Client(object):
         self.session.send_message(message)
         return self.session.recv_message()
 
+    @classmethod
+    def get_role_registry(cls):
+        """ The procedures and subscriptions declared on the class with
+        the ``register_rpc`` and ``subscribe`` decorators.
+
+        The class hierarchy is only scanned once per class and the
+        result cached on it, as the roles of a class are fixed at its
+        creation.
+
+        Returns a tuple of two lists, the keyword arguments for
+        :func:`wampy.roles.callee.register_procedures` and for
+        :func:`wampy.roles.subscriber.subscribe_to_topics`.
+
+        """
+        # looked up on the class itself so a subclass never inherits
+        # the registry of its parent
+        registry = cls.__dict__.get('_role_registry')
+        if registry is not None:
+            return registry
+
+        procedures = []
+        subscriptions = []
+        seen = set()
+
+        bases = [b for b in inspect.getmro(cls) if b is not object]
+        for base in bases:
+            for name, maybe_role in base.__dict__.items():
+                # an override in a subclass hides the role of its parent
+                if name in seen or not callable(maybe_role):
+                    continue
+                seen.add(name)
+
+                if hasattr(maybe_role, 'callee'):
+                    procedures.append({
+                        'procedure_name': maybe_role.func_name,
+                        'invocation_policy': maybe_role.invocation_policy,
+                        'executor': maybe_role.executor,
+                        'workers': maybe_role.workers,
+                        'cache': maybe_role.cache,
+                        'batch': maybe_role.batch,
+                        'max_batch': maybe_role.max_batch,
+                        'max_wait_ms': maybe_role.max_wait_ms,
+                    })
+
+                if hasattr(maybe_role, 'subscriber'):
+                    subscriptions.append({
+                        'topic': maybe_role.topic,
+                        'handler': maybe_role.handler,
+                        'parallelism': maybe_role.parallelism,
+                        'partition_key': maybe_role.partition_key,
+                        'max_queue_size': maybe_role.max_queue_size,
+                        'executor': maybe_role.executor,
+                        'match': maybe_role.match,
+                        'batch_size': maybe_role.batch_size,
+                        'linger_ms': maybe_role.linger_ms,
+                        'conflate': maybe_role.conflate,
+                        'key': maybe_role.key,
+                    })
+
+        registry = procedures, subscriptions
+        cls._role_registry = registry
+        return registry
+
     def register_roles(self):
         logger.info("registering roles for: %s", self.__class__.__name__)
 
-        maybe_roles = []
-        bases = [b for b in inspect.getmro(self.__class__) if b is not object]
+        procedures, subscriptions = self.get_role_registry()
+        if self.invocation_policy is not None:
+            procedures = [
+                dict(procedure, invocation_policy=self.invocation_policy)
+                for procedure in procedures
+            ]
 
-        for base in bases:
-            maybe_roles.extend(
-                v for v in base.__dict__.values() if
-                inspect.isclass(base) and callable(v)
-            )
+        # pipelined, rather than a round trip to the Router per role
+        if procedures:
+            register_procedures(self.session, procedures)
+        if subscriptions:
+            subscribe_to_topics(self.session, subscriptions)
 
-        for maybe_role in maybe_roles:
+    def send_call(self, procedure, args=None, kwargs=None, timeout=None):
+        """ Send a CALL without waiting for the RESULT.
 
-            if hasattr(maybe_role, 'callee'):
-                procedure_name = maybe_role.func_name
-                invocation_policy = maybe_role.invocation_policy
-                register_procedure(
-                    self.session, procedure_name, invocation_policy)
+        Returns a :class:`wampy.roles.caller.PendingCall` to ``wait()``
+        on, or to ``cancel()``. ``timeout`` defaults to the Client's
+        ``call_timeout``.
 
-            if hasattr(maybe_role, 'subscriber'):
-                topic = maybe_role.topic
-                handler = maybe_role.handler
-                subscribe_to_topic(self.session, topic, handler)
+        """
+        if timeout is None:
+            timeout = self.call_timeout
+
+        return PendingCall(
+            self.session, procedure, args=args, kwargs=kwargs,
+            timeout=timeout, local_bus=self.local_bus,
+        )
 
     @property
     def call(self):
-        return CallProxy(client=self)
+        return CallProxy(client=self, timeout=self.call_timeout)
 
     @property
     def rpc(self):
-        return RpcProxy(client=self)
+        return RpcProxy(client=self, timeout=self.call_timeout)
 
     @property
     def publish(self):
         return PublishProxy(client=self)
 
+    def subscribe(
+            self, topic, handler, match=EXACT, parallelism=None,
+            partition_key=None, max_queue_size=DEFAULT_MAX_QUEUE_SIZE,
+            executor=None, batch_size=None, linger_ms=DEFAULT_LINGER_MS,
+            conflate=False, key=None,
+    ):
+        """ Subscribe any callable to a topic while the Client runs.
+
+        Every handler of a topic (or of one covered by a broader
+        pattern) shares a single subscription on the Router, which is
+        only made for the first of them.
+
+        :Parameters:
+            topic : string
+            handler : callable
+                Called with the event's payload, as a method decorated
+                with :func:`wampy.roles.subscriber.subscribe` would be.
+            match : string
+                "exact", "prefix" or "wildcard".
+
+        The remaining arguments are those of the ``subscribe`` decorator.
+
+        Returns a :class:`wampy.roles.subscriber.Subscription` to pass to
+        :meth:`unsubscribe`.
+
+        """
+        name = "{}:{}".format(
+            getattr(handler, '__name__', 'handler'), uuid4())
+        subscribe_to_topics(self.session, [{
+            'topic': topic,
+            'handler': handler,
+            'parallelism': parallelism,
+            'partition_key': partition_key,
+            'max_queue_size': max_queue_size,
+            'executor': executor,
+            'match': match,
+            'name': name,
+            'batch_size': batch_size,
+            'linger_ms': linger_ms,
+            'conflate': conflate,
+            'key': key,
+        }])
+
+        return Subscription(
+            name=name, topic=topic, match=match, handler=handler)
+
+    def unsubscribe(self, subscription):
+        """ Remove a handler added by :meth:`subscribe`, and the
+        subscription on the Router along with it if it was the last. """
+        unsubscribe_from_topic(self.session, subscription.name)
+
+    def stream(
+            self, topic, maxsize=DEFAULT_MAX_QUEUE_SIZE, overflow=BLOCK,
+            match=EXACT,
+    ):
+        """ The events of a topic to iterate over, see
+        :class:`wampy.roles.stream.EventStream`. ::
+
+            with client.stream("ticks", overflow="drop_oldest") as events:
+                for event in events:
+                    ...
+
+        """
+        return EventStream(
+            self, topic, maxsize=maxsize, overflow=overflow, match=match)
+
     def get_subscription_handler_names(self):
         handler_names = []
-        for handler, topic in self.subscription_map.values():
-            handler_names.append(handler)
+        for entries in self.session.handlers.values():
+            for _, handler_name, _, _, _ in entries:
+                handler_names.append(handler_name)
         return handler_names
 
     def get_subscription_info(self, subscription_id):
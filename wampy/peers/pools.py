@@ -0,0 +1,544 @@
+import logging
+import multiprocessing
+import os
+import signal
+from collections import Counter
+from time import time as now
+
+from contextlib import contextmanager
+
+import eventlet
+from eventlet import hubs, tpool
+from eventlet.hubs import trampoline
+
+from wampy.errors import WampyError, WampyTimeOutError
+from wampy.peers.clients import Client
+from wampy.roles.executors import close_inherited_fds
+
+
+logger = logging.getLogger('wampy.pools')
+
+# seconds to wait on a worker process to start or stop its sessions
+DEFAULT_PROCESS_TIMEOUT = 30
+# seconds between health checks of the sessions of a ClientPool
+DEFAULT_HEALTH_CHECK_INTERVAL = 10
+# seconds a surplus session of a ClientPool may idle before it is closed
+DEFAULT_MAX_IDLE_TIME = 60
+
+
+def _reset_after_fork():
+    # the parent's hub and OS thread pool do not survive the fork, so
+    # the child begins with fresh ones
+    hubs.use_hub()
+    try:
+        tpool.killall()
+    except Exception as exc:
+        logger.debug("failed to reset the thread pool: %s", exc)
+
+
+def _recv(connection, timeout=None):
+    # a green read, so the hub carries on serving Sessions meanwhile
+    trampoline(
+        connection.fileno(), read=True, timeout=timeout,
+        timeout_exc=WampyTimeOutError("no reply from worker process"),
+    )
+    return connection.recv()
+
+
+def aggregate_stats(services):
+    stats = Counter()
+    for service in services:
+        stats.update(service.session.stats)
+
+    stats['sessions'] += len(services)
+    return stats
+
+
+def _serve(service_class, router, sessions, client_kwargs, commands, replies):
+    """ The main loop of a worker process of a :class:`ServicePool`. """
+    close_inherited_fds(keep=[commands.fileno(), replies.fileno()])
+    _reset_after_fork()
+
+    # SIGTERM asks the worker to drain and leave, whilst a Ctrl-C at a
+    # terminal is left to the parent, which passes on a SIGTERM
+    terminated = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: terminated.append(1))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    services = [
+        service_class(router=router, **client_kwargs)
+        for _ in range(sessions)
+    ]
+
+    try:
+        for service in services:
+            service.start()
+    except Exception as exc:
+        replies.send((False, str(exc)))
+        return
+
+    replies.send((True, os.getpid()))
+
+    while not terminated:
+        try:
+            command = _recv(commands, timeout=1)
+        except WampyTimeOutError:
+            continue
+        except EOFError:
+            break
+
+        if command == "stats":
+            replies.send(aggregate_stats(services))
+        elif command == "stop":
+            break
+
+    for service in services:
+        if terminated:
+            service.drain()
+        else:
+            service.stop()
+
+    if not terminated:
+        replies.send(None)
+
+
+class ServiceProcess(object):
+    """ A worker process running sessions of a :class:`ServicePool`. """
+
+    def __init__(self, service_class, router, sessions, client_kwargs):
+        commands_reader, self.commands = multiprocessing.Pipe(duplex=False)
+        self.replies, replies_writer = multiprocessing.Pipe(duplex=False)
+
+        self.sessions = sessions
+        self.process = multiprocessing.Process(
+            target=_serve,
+            args=(
+                service_class, router, sessions, client_kwargs,
+                commands_reader, replies_writer,
+            ),
+        )
+        self.process.daemon = True
+        self.process.start()
+
+        commands_reader.close()
+        replies_writer.close()
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def wait_until_ready(self, timeout=DEFAULT_PROCESS_TIMEOUT):
+        started, detail = _recv(self.replies, timeout=timeout)
+        if not started:
+            raise WampyError(
+                "worker process failed to start: {}".format(detail))
+
+    def request(self, command, timeout=DEFAULT_PROCESS_TIMEOUT):
+        self.commands.send(command)
+        return _recv(self.replies, timeout=timeout)
+
+    def stop(self, timeout=DEFAULT_PROCESS_TIMEOUT):
+        if self.is_alive():
+            try:
+                self.request("stop", timeout=timeout)
+            except (EOFError, IOError, WampyTimeOutError) as exc:
+                logger.warning(
+                    "worker process %s did not stop cleanly: %s",
+                    self.pid, exc)
+
+        self.join(timeout=1)
+
+    def terminate(self, timeout=DEFAULT_PROCESS_TIMEOUT):
+        """ Send SIGTERM and give the worker ``timeout`` seconds to end
+        its sessions before it is killed. """
+        if self.is_alive():
+            os.kill(self.pid, signal.SIGTERM)
+
+        self.join(timeout=timeout)
+
+    def join(self, timeout):
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            logger.warning("killing worker process %s", self.pid)
+            self.process.terminate()
+            self.process.join(timeout=1)
+
+        self.commands.close()
+        self.replies.close()
+
+
+class ServicePool(object):
+    """ Scale a service out over many Sessions and processes.
+
+    A ``Client`` has a single Session over a single connection, served
+    by one green thread in one process. A ``ServicePool`` starts
+    ``sessions`` instances of the ``service_class`` spread over
+    ``processes`` worker processes, each registering the same
+    procedures with a shared ``invocation_policy`` so that the Dealer
+    spreads the calls over all of them.
+
+    With ``processes=1`` the Sessions run in this process; else they
+    are forked into worker processes and this one only manages them.
+
+    """
+
+    def __init__(
+            self, service_class, router, sessions=1, processes=1,
+            invocation_policy="roundrobin", **client_kwargs
+    ):
+        """ A pool of instances of a single service.
+
+        :Parameters:
+            service_class : class
+                A subclass of :class:`peers.Client`.
+            router : instance
+                An instance of :class:`peers.Router`.
+            sessions : int
+                The total number of instances of the service to run.
+            processes : int
+                The number of processes to run them in.
+            invocation_policy : str
+                The policy every procedure is registered with, which
+                must allow for more than one Callee.
+            client_kwargs : dict
+                Passed on to every instance of ``service_class``.
+
+        """
+        if sessions < processes:
+            raise WampyError(
+                "fewer sessions ({}) than processes ({})".format(
+                    sessions, processes)
+            )
+
+        self.service_class = service_class
+        self.router = router
+        self.sessions = sessions
+        self.processes = processes
+        self.client_kwargs = dict(
+            client_kwargs, invocation_policy=invocation_policy)
+
+        self.services = []
+        self.workers = []
+        self._supervising = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.stop()
+
+    def start(self):
+        if self.processes == 1:
+            for _ in range(self.sessions):
+                service = self.service_class(
+                    router=self.router, **self.client_kwargs)
+                service.start()
+                self.services.append(service)
+        else:
+            for sessions in self._sessions_per_process():
+                self.workers.append(self._start_worker(sessions))
+
+            for worker in self.workers:
+                worker.wait_until_ready()
+
+        logger.info(
+            "started %s sessions of %s over %s process(es)",
+            self.sessions, self.service_class.__name__, self.processes)
+
+    def stop(self):
+        for service in self.services:
+            service.stop()
+
+        for worker in self.workers:
+            worker.stop()
+
+        self.services = []
+        self.workers = []
+
+    def supervise(self, interval=1):
+        """ Block, restarting any worker process that dies, until
+        :meth:`stop_supervising` is called, e.g. from a signal handler.
+        """
+        self._supervising = True
+        while self._supervising:
+            self.restart_crashed_workers()
+            eventlet.sleep(interval)
+
+    def stop_supervising(self):
+        self._supervising = False
+
+    def restart_crashed_workers(self):
+        for index, worker in enumerate(self.workers):
+            if worker.is_alive():
+                continue
+
+            logger.warning(
+                "worker process %s exited with %s, restarting",
+                worker.pid, worker.process.exitcode)
+            worker.join(timeout=0)
+
+            replacement = self._start_worker(worker.sessions)
+            self.workers[index] = replacement
+            try:
+                replacement.wait_until_ready()
+            except (EOFError, IOError, WampyError, WampyTimeOutError) as exc:
+                # left for the next round of supervision to try again
+                logger.error("failed to restart worker process: %s", exc)
+
+    def terminate(self, timeout=DEFAULT_PROCESS_TIMEOUT):
+        """ Pass a SIGTERM on to every worker process, so they drain their
+        sessions, and wait up to ``timeout`` seconds for them all to
+        exit. """
+        for worker in self.workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGTERM)
+
+        deadline = now() + timeout
+        for worker in self.workers:
+            worker.terminate(timeout=max(0, deadline - now()))
+
+        for service in self.services:
+            service.stop()
+
+        self.services = []
+        self.workers = []
+
+    def stats(self):
+        """ The totals of the stats of every Session in the pool, e.g.
+        the number of ``invocations`` handled. """
+        stats = aggregate_stats(self.services)
+
+        for worker in self.workers:
+            try:
+                stats.update(worker.request("stats"))
+            except (EOFError, IOError, WampyTimeOutError) as exc:
+                logger.warning(
+                    "no stats from worker process %s: %s", worker.pid, exc)
+
+        return stats
+
+    def _sessions_per_process(self):
+        share, remainder = divmod(self.sessions, self.processes)
+        return [
+            share + (1 if index < remainder else 0)
+            for index in range(self.processes)
+        ]
+
+    def _start_worker(self, sessions):
+        return ServiceProcess(
+            self.service_class, self.router, sessions, self.client_kwargs)
+
+
+class ClientPool(object):
+    """ A pool of Sessions for Callers and Publishers which are too
+    busy for one connection, and too short lived to pay for the
+    handshakes of one of their own, e.g. the requests of a web app.
+
+    Calls and publishes go through the least loaded Session, i.e. the
+    one with the fewest calls in flight. A Session is added whenever
+    they are all busy, up to ``max_sessions``, and surplus Sessions are
+    closed again once they have been idle for ``max_idle_time``
+    seconds. Sessions that have lost their connection are replaced.
+
+    """
+
+    def __init__(
+            self, router, min_sessions=1, max_sessions=10,
+            client_class=Client,
+            health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+            max_idle_time=DEFAULT_MAX_IDLE_TIME, **client_kwargs
+    ):
+        """ A pool of connected Clients.
+
+        :Parameters:
+            router : instance
+                An instance of :class:`peers.Router`.
+            min_sessions : int
+                The number of Sessions started up front and kept open.
+            max_sessions : int
+                The most Sessions that the pool will grow to.
+            client_class : class
+                :class:`peers.Client`, or a subclass of.
+            health_check_interval : int
+                Seconds between checks that idle Sessions are still
+                connected.
+            max_idle_time : int
+                Seconds before an idle Session beyond ``min_sessions``
+                is closed.
+            client_kwargs : dict
+                Passed on to every Client.
+
+        """
+        if not 0 < min_sessions <= max_sessions:
+            raise WampyError(
+                "bad pool size: {} to {} sessions".format(
+                    min_sessions, max_sessions)
+            )
+
+        self.router = router
+        self.min_sessions = min_sessions
+        self.max_sessions = max_sessions
+        self.client_class = client_class
+        self.health_check_interval = health_check_interval
+        self.max_idle_time = max_idle_time
+        self.client_kwargs = client_kwargs
+
+        self.clients = []
+        # client ID -> calls in flight, and when it was last checked in
+        self._load = {}
+        self._last_used = {}
+        self._starting = 0
+        self._health_checker = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.stop()
+
+    @property
+    def size(self):
+        return len(self.clients)
+
+    def start(self):
+        for _ in range(self.min_sessions):
+            self._add_client()
+
+        self._health_checker = eventlet.spawn(self._check_health_forever)
+
+    def stop(self):
+        if self._health_checker is not None:
+            self._health_checker.kill()
+            self._health_checker = None
+
+        for client in list(self.clients):
+            self._remove_client(client)
+
+    def checkout(self):
+        """ Take the least loaded Client from the pool, growing the pool
+        if every Client is busy. Hand it back with :meth:`checkin`. """
+        client = self._least_loaded()
+        if self._load[client.id] > 0 and self._can_grow():
+            client = self._add_client()
+
+        self._load[client.id] += 1
+        return client
+
+    def checkin(self, client):
+        if client.id not in self._load:
+            # removed from the pool whilst checked out
+            return
+
+        self._load[client.id] -= 1
+        self._last_used[client.id] = now()
+
+    @contextmanager
+    def checked_out(self):
+        client = self.checkout()
+        try:
+            yield client
+        finally:
+            self.checkin(client)
+
+    def call(self, procedure, *args, **kwargs):
+        with self.checked_out() as client:
+            return client.call(procedure, *args, **kwargs)
+
+    @property
+    def rpc(self):
+        return PooledRpcProxy(pool=self)
+
+    def publish(self, **kwargs):
+        with self.checked_out() as client:
+            return client.publish(**kwargs)
+
+    def check_health(self):
+        """ Replace idle Clients that have lost their connection, and
+        close idle Clients beyond ``min_sessions`` not used of late. """
+        for client in list(self.clients):
+            if self._load[client.id] > 0:
+                continue
+
+            if not client.session.connected:
+                logger.warning("replacing disconnected client %s", client.id)
+                self._remove_client(client)
+                continue
+
+            idle_time = now() - self._last_used[client.id]
+            if self.size > self.min_sessions and (
+                    idle_time > self.max_idle_time):
+                logger.info("closing idle client %s", client.id)
+                self._remove_client(client)
+
+        while self.size + self._starting < self.min_sessions:
+            self._add_client()
+
+    def stats(self):
+        in_flight = sum(self._load.values())
+        return Counter(sessions=self.size, in_flight=in_flight)
+
+    def _check_health_forever(self):
+        while True:
+            eventlet.sleep(self.health_check_interval)
+            try:
+                self.check_health()
+            except Exception:
+                logger.exception("client pool health check failed")
+
+    def _least_loaded(self):
+        healthy = [
+            client for client in self.clients if client.session.connected]
+        if not healthy:
+            if not self._can_grow():
+                raise WampyError("no connected client in the pool")
+            return self._add_client()
+
+        return min(healthy, key=lambda client: self._load[client.id])
+
+    def _can_grow(self):
+        return self.size + self._starting < self.max_sessions
+
+    def _add_client(self):
+        self._starting += 1
+        try:
+            client = self.client_class(
+                router=self.router, **self.client_kwargs)
+            client.start()
+        finally:
+            self._starting -= 1
+
+        self._load[client.id] = 0
+        self._last_used[client.id] = now()
+        self.clients.append(client)
+        return client
+
+    def _remove_client(self, client):
+        self.clients.remove(client)
+        self._load.pop(client.id, None)
+        self._last_used.pop(client.id, None)
+
+        try:
+            client.stop()
+        except Exception as exc:
+            logger.warning("failed to stop client %s: %s", client.id, exc)
+
+
+class PooledRpcProxy(object):
+    """ ``pool.rpc.procedure(*args, **kwargs)``, as for a Client, but
+    over a Client checked out of a :class:`ClientPool`. """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __getattr__(self, name):
+
+        def wrapper(*args, **kwargs):
+            with self.pool.checked_out() as client:
+                return getattr(client.rpc, name)(*args, **kwargs)
+
+        return wrapper
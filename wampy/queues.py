@@ -0,0 +1,317 @@
+import heapq
+import itertools
+import json
+import logging
+from collections import deque
+
+import eventlet
+from eventlet.event import Event
+
+from wampy.constants import (
+    BLOCK, DEFAULT_INBOUND_QUEUE_BYTES, DEFAULT_INBOUND_QUEUE_SIZE,
+    DEFAULT_SEND_HIGH_WATER, DEFAULT_SEND_LOW_WATER, DROP_NEWEST, DROP_OLDEST,
+)
+from wampy.errors import WampyError
+from wampy.messages import MESSAGE_TYPE_MAP, Message
+
+logger = logging.getLogger('wampy.queues')
+
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# the classes of outbound messages, most urgent first
+CONTROL, RESPONSE, REQUEST, BULK = range(4)
+
+PRIORITIES = {
+    Message.HELLO: CONTROL,
+    Message.AUTHENTICATE: CONTROL,
+    Message.ABORT: CONTROL,
+    Message.GOODBYE: CONTROL,
+    # a Caller is waiting on these
+    Message.YIELD: RESPONSE,
+    Message.ERROR: RESPONSE,
+    Message.CALL: REQUEST,
+    Message.CANCEL: REQUEST,
+    Message.REGISTER: REQUEST,
+    Message.UNREGISTER: REQUEST,
+    Message.SUBSCRIBE: REQUEST,
+    Message.UNSUBSCRIBE: REQUEST,
+    Message.PUBLISH: BULK,
+}
+
+
+class InboundQueue(object):
+    """ The messages received that are not handled as they arrive, such
+    as the WELCOME or GOODBYE a Session waits on with ``recv_message``.
+
+    Events, invocations and the responses to requests are handled as
+    they are read and never queued, so on a healthy Session this queue
+    stays all but empty. It is bounded all the same, by the number of
+    messages and by their total size in bytes, so that messages nobody
+    reads cannot exhaust the process.
+
+    When a message would exceed either limit the ``overflow`` decides:
+
+        * "drop_oldest" drops the longest waiting message(s)
+        * "drop_newest" drops the message received
+        * "block" holds up the reader until there is room, which stops
+          reads from the socket and pushes back on the Router
+
+    A message is always let into an empty queue, however large, and
+    every message dropped is counted in ``dropped``.
+
+    """
+
+    def __init__(
+            self, maxsize=DEFAULT_INBOUND_QUEUE_SIZE,
+            max_bytes=DEFAULT_INBOUND_QUEUE_BYTES, overflow=DROP_OLDEST,
+    ):
+        """
+        :Parameters:
+            maxsize : int
+                The maximum number of messages waiting.
+            max_bytes : int
+                The maximum total size of the messages waiting, as
+                serialized.
+            overflow : string
+                "drop_oldest", "drop_newest" or "block".
+
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise WampyError(
+                "overflow must be one of {}, not: {}".format(
+                    ", ".join(OVERFLOW_POLICIES), overflow)
+            )
+        if maxsize < 1:
+            raise WampyError(
+                "maxsize must be at least 1, not: {}".format(maxsize))
+
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+
+        self.dropped = 0
+        # the total size of the messages waiting
+        self.bytes = 0
+
+        # (message, size), oldest first
+        self._messages = deque()
+
+    def __len__(self):
+        return len(self._messages)
+
+    def qsize(self):
+        return len(self._messages)
+
+    def _has_room(self, size):
+        return not self._messages or (
+            len(self._messages) < self.maxsize and
+            self.bytes + size <= self.max_bytes
+        )
+
+    def put(self, message):
+        size = len(json.dumps(message))
+
+        while not self._has_room(size):
+            if self.overflow == BLOCK:
+                # as for ``recv_message``, let the consumer run
+                eventlet.sleep()
+            elif self.overflow == DROP_NEWEST:
+                self._drop(message)
+                return
+            else:
+                dropped, dropped_size = self._messages.popleft()
+                self.bytes -= dropped_size
+                self._drop(dropped)
+
+        self._messages.append((message, size))
+        self.bytes += size
+
+    def get(self):
+        message, size = self._messages.popleft()
+        self.bytes -= size
+        return message
+
+    def clear(self):
+        self._messages.clear()
+        self.bytes = 0
+
+    def _drop(self, message):
+        self.dropped += 1
+        logger.warning(
+            'inbound queue is full, dropped unread %s',
+            MESSAGE_TYPE_MAP.get(message[0], message[0]),
+        )
+
+
+class OutboundScheduler(object):
+    """ Decides the order that messages are written to the connection
+    in, so that control traffic and responses to Callers are never
+    stuck behind a burst of publications.
+
+    Only one message is written at a time. Whilst one is, the others
+    wait their turn by priority - see ``PRIORITIES`` - and then by
+    arrival. Every message but a PUBLISH is written by its sender, who
+    waits for it to be sent and sees any failure to send it.
+
+    A PUBLISH is not acknowledged, so its sender need not wait: it is
+    put on a send queue written by a green thread of its own, a message
+    at a time and behind anything more urgent. Once ``high_water``
+    bytes are waiting to be sent, publishers wait until no more than
+    ``low_water`` are, which bounds the queue and pushes back on them.
+
+    """
+
+    def __init__(
+            self, send, high_water=DEFAULT_SEND_HIGH_WATER,
+            low_water=DEFAULT_SEND_LOW_WATER, stats=None,
+    ):
+        """
+        :Parameters:
+            send : func
+                Writes a serialized message to the connection.
+            high_water : int
+                Bytes queued at which publishers wait.
+            low_water : int
+                Bytes queued at which they carry on.
+            stats : Counter
+                Where to count ``publisher_stalls``, e.g. the Session's
+                ``stats``.
+
+        """
+        if low_water > high_water:
+            raise WampyError(
+                "low_water cannot be above high_water: {} > {}".format(
+                    low_water, high_water)
+            )
+
+        self.send = send
+        self.high_water = high_water
+        self.low_water = low_water
+        self.stats = stats
+
+        # the total size of the publications queued
+        self.bytes = 0
+
+        # whether a message is being written
+        self._writing = False
+        # (priority, arrival, turn) of the senders waiting to write
+        self._waiting = []
+        self._arrivals = itertools.count()
+
+        self._publications = deque()
+        self._writer = None
+        # sent to the publishers waiting on the high water mark
+        self._below_water = None
+
+    def __len__(self):
+        """ The number of publications queued. """
+        return len(self._publications)
+
+    def send_message(self, wamp_code, message):
+        """ Send a serialized message, in its turn. """
+        priority = PRIORITIES.get(wamp_code, REQUEST)
+        if priority == BULK:
+            self._enqueue(message)
+            return
+
+        self._acquire(priority)
+        try:
+            self.send(message)
+        finally:
+            self._release()
+
+    def flush(self, timeout):
+        """ Wait up to ``timeout`` seconds for the publications queued
+        to be sent, and drop any that were not. """
+        with eventlet.Timeout(timeout, False):
+            while self._publications:
+                eventlet.sleep(0.01)
+
+        if self._publications:
+            logger.warning(
+                'dropped %s publications not sent in %ss',
+                len(self._publications), timeout)
+
+        self.clear()
+
+    def clear(self):
+        if self._writer is not None:
+            self._writer.kill()
+            self._writer = None
+
+        self._publications.clear()
+        self.bytes = 0
+        self._wake_publishers()
+
+    def _acquire(self, priority):
+        if not self._writing:
+            self._writing = True
+            return
+
+        turn = Event()
+        entry = priority, next(self._arrivals), turn
+        heapq.heappush(self._waiting, entry)
+
+        try:
+            # the writer is handed over directly, by ``_release``
+            turn.wait()
+        except BaseException:
+            if turn.ready():
+                # handed over only to be given up
+                self._release()
+            else:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+            raise
+
+    def _release(self):
+        if self._waiting:
+            _, _, turn = heapq.heappop(self._waiting)
+            turn.send()
+        else:
+            self._writing = False
+
+    def _enqueue(self, message):
+        if self.bytes >= self.high_water:
+            if self.stats is not None:
+                self.stats['publisher_stalls'] += 1
+            if self._below_water is None:
+                self._below_water = Event()
+            self._below_water.wait()
+
+        self._publications.append(message)
+        self.bytes += len(message)
+
+        if self._writer is None:
+            self._writer = eventlet.spawn(self._write_publications)
+
+    def _write_publications(self):
+        while self._publications:
+            message = self._publications[0]
+
+            self._acquire(BULK)
+            try:
+                self.send(message)
+            except Exception as exc:
+                # the connection is lost, and what is queued with it
+                logger.warning(
+                    'dropped %s publications: %s',
+                    len(self._publications), exc)
+                self._publications.clear()
+                self.bytes = 0
+                self._wake_publishers()
+                break
+            finally:
+                self._release()
+
+            self._publications.popleft()
+            self.bytes -= len(message)
+            if self.bytes <= self.low_water:
+                self._wake_publishers()
+
+        self._writer = None
+
+    def _wake_publishers(self):
+        below_water, self._below_water = self._below_water, None
+        if below_water is not None:
+            below_water.send()
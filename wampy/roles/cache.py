@@ -0,0 +1,201 @@
+import logging
+from collections import Counter, OrderedDict
+from time import time as now
+
+from wampy.errors import WampyError
+from wampy.roles.caller import call_key
+
+logger = logging.getLogger('wampy.cache')
+
+# the number of results kept, over all procedures, before the least
+# recently used is evicted
+DEFAULT_CACHE_SIZE = 1024
+# seconds a result is fresh for, unless configured per procedure
+DEFAULT_CACHE_TTL = 60
+
+
+class ResultCache(object):
+    """ Keeps the results of calls to procedures whose answers rarely
+    change, so that repeating a call needs no round trip.
+
+    Only the procedures configured are cached, each result under the
+    arguments it was called with, and only until its time to live has
+    passed or it is evicted as the least recently used. A Client given
+    the cache subscribes to the ``invalidation_topic`` of its procedures,
+    and an event on one drops every result of those procedures.
+
+    ``stats`` counts the ``hits``, ``misses``, ``evictions`` and
+    ``invalidations``.
+
+    A cached result is shared between its callers, who must not mutate
+    it.
+
+    """
+
+    def __init__(self, procedures, max_size=DEFAULT_CACHE_SIZE):
+        """ Configure the cache.
+
+        :Parameters:
+            procedures : dict
+                Options by procedure name: ``ttl``, in seconds, and
+                ``invalidation_topic``, both optional. E.g. ::
+
+                    {
+                        "get_config": {
+                            "ttl": 300,
+                            "invalidation_topic": "config.changed",
+                        },
+                        "get_symbols": {},
+                    }
+
+            max_size : int
+                The maximum number of results kept.
+
+        """
+        if max_size < 1:
+            raise WampyError(
+                "max_size must be at least 1, not: {}".format(max_size))
+
+        self.procedures = procedures
+        self.max_size = max_size
+        self.stats = Counter()
+
+        # key -> (procedure, expiry, response), least recently used first
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def caches(self, procedure):
+        return procedure in self.procedures
+
+    @property
+    def invalidation_topics(self):
+        """ The procedures to invalidate by topic. """
+        topics = {}
+        for procedure, options in self.procedures.items():
+            topic = options.get('invalidation_topic')
+            if topic is not None:
+                topics.setdefault(topic, []).append(procedure)
+        return topics
+
+    def key(self, procedure, args, kwargs):
+        return call_key(procedure, args, kwargs)
+
+    def get(self, key):
+        """ The response cached under ``key`` if still fresh, else
+        ``None``. """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+
+        _, expiry, response = entry
+        if expiry < now():
+            self.stats['misses'] += 1
+            return None
+
+        # moved to the most recently used end
+        self._entries[key] = entry
+        self.stats['hits'] += 1
+        return response
+
+    def put(self, key, procedure, response):
+        ttl = self.procedures[procedure].get('ttl', DEFAULT_CACHE_TTL)
+
+        self._entries.pop(key, None)
+        self._entries[key] = procedure, now() + ttl, response
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def invalidate(self, procedure=None):
+        """ Drop every result of ``procedure``, or of all procedures. """
+        stale = [
+            key for key, (entry_procedure, _, _) in self._entries.items()
+            if procedure is None or entry_procedure == procedure
+        ]
+        for key in stale:
+            del self._entries[key]
+
+        self.stats['invalidations'] += 1
+        logger.info(
+            'invalidated %s results of %s', len(stale), procedure or "all")
+
+    def invalidation_handler(self, topic):
+        """ An event handler that invalidates the procedures of
+        ``topic``. """
+        procedures = self.invalidation_topics[topic]
+
+        def invalidate(*args, **kwargs):
+            for procedure in procedures:
+                self.invalidate(procedure)
+
+        return invalidate
+
+
+class ProcedureMemo(object):
+    """ Memoizes the results of a pure procedure on its Callee, see
+    ``register_rpc(cache=...)``.
+
+    Each result is kept as its YIELD was encoded, so that an invocation
+    answered from the memo neither runs the procedure nor serializes its
+    result again.
+
+    """
+
+    def __init__(
+            self, ttl=DEFAULT_CACHE_TTL, max_entries=DEFAULT_CACHE_SIZE,
+            key=None,
+    ):
+        """ Configure the memo.
+
+        :Parameters:
+            ttl : int
+                Seconds a result is kept for.
+            max_entries : int
+                The maximum number of results kept, beyond which the
+                least recently used is evicted.
+            key : func
+                Called with the procedure's arguments for the hashable
+                key of its result. By default the arguments are the key.
+
+        """
+        if max_entries < 1:
+            raise WampyError(
+                "max_entries must be at least 1, not: {}".format(
+                    max_entries))
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key_function = key
+
+        # key -> (expiry, value), least recently used first
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, args, kwargs):
+        if self.key_function is not None:
+            return self.key_function(*args, **kwargs)
+        return call_key(None, args, kwargs)
+
+    def get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] < now():
+            return None
+
+        self._entries[key] = entry
+        return entry[1]
+
+    def put(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = now() + self.ttl, value
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
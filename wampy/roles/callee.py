@@ -3,7 +3,11 @@ import types
 from functools import partial
 from uuid import uuid4
 
+from wampy.messages import Message
 from wampy.messages.register import Register
+from wampy.roles.cache import ProcedureMemo
+from wampy.roles.executors import (
+    DEFAULT_MAX_BATCH, DEFAULT_MAX_WAIT_MS, BatchExecutor, executor_builder)
 from wampy.session import session_builder
 
 
@@ -11,28 +15,94 @@ logger = logging.getLogger(__name__)
 
 
 def register_procedure(
-        session, procedure_name, invocation_policy="single"):
+        session, procedure_name, invocation_policy="single", executor=None,
+        workers=None, cache=None, batch=False, max_batch=DEFAULT_MAX_BATCH,
+        max_wait_ms=DEFAULT_MAX_WAIT_MS,
+):
+    register_procedures(session, [{
+        'procedure_name': procedure_name,
+        'invocation_policy': invocation_policy,
+        'executor': executor,
+        'workers': workers,
+        'cache': cache,
+        'batch': batch,
+        'max_batch': max_batch,
+        'max_wait_ms': max_wait_ms,
+    }])
+
+
+def register_procedures(session, procedures):
+    """ Register many procedures for the price of one round trip.
+
+    Every REGISTER is sent before any REGISTERED is waited on, and the
+    two are correlated by request ID. Each procedure is ready to be
+    invoked as soon as its REGISTERED is read, as the Dealer may invoke
+    it straight away.
+
+    :Parameters:
+        session : instance
+            The :class:`wampy.session.Session` to register on.
+        procedures : list of dicts
+            The keyword arguments to :func:`register_procedure` for
+            each procedure, less the ``session``.
+
+    """
+    messages = []
+    for procedure in procedures:
+        invocation_policy = procedure.get('invocation_policy', "single")
+        logger.info(
+            "registering %s with invocation policy %s",
+            procedure['procedure_name'], invocation_policy
+        )
 
-    logger.info(
-        "registering %s with invocation policy %s",
-        procedure_name, invocation_policy
-    )
+        options = {"invoke": invocation_policy}
+        messages.append(Register(
+            procedure=procedure['procedure_name'], options=options))
+
+    def registered(index, response_msg):
+        if response_msg[0] == Message.REGISTERED:
+            _registered(
+                session, procedures[index], messages[index], response_msg)
+
+    responses = session.request_all(messages, on_response=registered)
 
-    options = {"invoke": invocation_policy}
-    message = Register(procedure=procedure_name, options=options)
+    for response_msg in responses:
+        if response_msg is None or response_msg[0] != Message.REGISTERED:
+            logger.error(
+                "failed to register callee: %s", response_msg
+            )
 
-    session.send_message(message)
-    response_msg = session.recv_message()
 
-    try:
-        _, _, registration_id = response_msg
-    except ValueError:
-        logger.error(
-            "failed to register callee: %s", response_msg
+def _registered(session, procedure, message, response_msg):
+    procedure_name = procedure['procedure_name']
+
+    executor = procedure.get('executor')
+    if executor is not None:
+        executor = executor_builder(
+            executor, workers=procedure.get('workers'))
+
+    if procedure.get('batch'):
+        # the batch is run on the executor named, if any
+        executor = BatchExecutor(
+            max_batch=procedure.get('max_batch', DEFAULT_MAX_BATCH),
+            max_wait_ms=procedure.get(
+                'max_wait_ms', DEFAULT_MAX_WAIT_MS),
+            executor=executor,
         )
-        return
+        executor.start()
+
+    if executor is not None:
+        session.executors[procedure_name] = executor
+
+    cache = procedure.get('cache')
+    if cache:
+        # ``True`` for the defaults, else the options of the memo
+        options = {} if cache is True else cache
+        session.memos[procedure_name] = ProcedureMemo(**options)
 
-    session.registration_map[procedure_name] = registration_id
+    _, _, registration_id = response_msg
+    session.add_registration(procedure_name, registration_id)
+    session.declared_procedures[procedure_name] = message.options
 
     logger.info(
         'registered procedure name "%s"', procedure_name,
@@ -43,6 +113,8 @@ class RegisterProcedureDecorator(object):
 
     def __init__(self, *args, **kwargs):
         self.invocation_policy = kwargs.get("invocation_policy", "single")
+        self.executor = kwargs.get("executor")
+        self.workers = kwargs.get("workers")
 
     @classmethod
     def decorator(cls, *args, **kwargs):
@@ -51,6 +123,18 @@ class RegisterProcedureDecorator(object):
             invocation_policy = kwargs.get("invocation_policy", "single")
             fn.callee = True
             fn.invocation_policy = invocation_policy
+            # procedures run on the reader unless an executor is named,
+            # see :mod:`wampy.roles.executors`
+            fn.executor = kwargs.get("executor")
+            fn.workers = kwargs.get("workers")
+            # memoize a pure procedure, see
+            # :class:`wampy.roles.cache.ProcedureMemo`
+            fn.cache = kwargs.get("cache")
+            # gather concurrent invocations into one call, see
+            # :class:`wampy.roles.executors.BatchExecutor`
+            fn.batch = kwargs.get("batch", False)
+            fn.max_batch = kwargs.get("max_batch", DEFAULT_MAX_BATCH)
+            fn.max_wait_ms = kwargs.get("max_wait_ms", DEFAULT_MAX_WAIT_MS)
             return fn
 
         if len(args) == 1 and isinstance(args[0], types.FunctionType):
@@ -118,8 +202,10 @@ class RpcProxy(object):
 
     def start(self):
         self.session.begin()
-        for procedure_name in self.procedure_names:
-            register_procedure(self.session, procedure_name)
+        register_procedures(self.session, [
+            {'procedure_name': procedure_name}
+            for procedure_name in self.procedure_names
+        ])
 
         logger.info("registered to %s", ", ".join(self.procedure_names))
 
@@ -1,13 +1,202 @@
+import json
 import logging
 
-from wampy.errors import WampProtocolError
+import eventlet
+from eventlet.event import Event
+from eventlet.queue import Empty
+
+from wampy.errors import WampProtocolError, WampyError, WampyTimeOutError
 from wampy.messages import MESSAGE_TYPE_MAP
 from wampy.messages import Message
 from wampy.messages.call import Call
+from wampy.messages.cancel import Cancel
 
 logger = logging.getLogger('wampy.rpc')
 
 
+class PendingCall(object):
+    """ A CALL that has been sent to the Dealer and is yet to be
+    answered.
+
+    The ``timeout`` is also forwarded to the Dealer as the call's
+    ``timeout`` option. When it expires the call is cancelled, so any
+    RESULT that turns up late is dropped rather than being mistaken
+    for the answer to a later call.
+
+    With ``receive_progress`` the Callee may answer with a stream of
+    progressive RESULTs before the final one. Iterate over the
+    ``PendingCall`` to receive each as it arrives, in which case the
+    ``timeout`` applies to the wait for every next response.
+
+    Given a :class:`wampy.peers.bus.LocalBus`, a procedure registered by
+    a Client in the same process is invoked on it directly and the
+    Router is not involved.
+
+    """
+    def __init__(
+            self, session, procedure, args=None, kwargs=None, timeout=None,
+            receive_progress=False, local_bus=None,
+    ):
+        options = {}
+        if timeout is not None:
+            options['timeout'] = int(timeout * 1000)
+        if receive_progress:
+            options['receive_progress'] = True
+
+        self.session = session
+        self.timeout = timeout
+        self.message = Call(
+            procedure=procedure, options=options, args=args, kwargs=kwargs)
+        self.request_id = self.message.request_id
+        self.done = False
+
+        self.local_bus = local_bus
+        self.callee = None
+        if local_bus is not None:
+            self.callee = local_bus.callee(procedure)
+
+        if self.callee is None:
+            self._responses = session.send_request(self.message)
+        else:
+            session.stats['local_calls'] += 1
+            self._invocation_id, self._responses = local_bus.invoke(
+                self.callee, self.request_id, procedure, args=args,
+                kwargs=kwargs, receive_progress=receive_progress,
+            )
+
+    def __iter__(self):
+        while not self.done:
+            yield self._next_response()
+
+    def wait(self):
+        """ Wait for the final response, discarding any progressive
+        results. """
+        response = None
+        for response in self:
+            pass
+
+        return response
+
+    def _next_response(self):
+        try:
+            response = self._responses.get(timeout=self.timeout)
+        except Empty:
+            self.cancel()
+            raise WampyTimeOutError(
+                "no response to call of \"{}\" within {}s".format(
+                    self.message.procedure, self.timeout)
+            )
+
+        is_progress = (
+            response[0] == Message.RESULT and response[2].get('progress')
+        )
+        if not is_progress:
+            self.done = True
+            if self.callee is None:
+                self.session.forget_request(self.request_id)
+
+        return response
+
+    def cancel(self, mode="killnowait"):
+        if self.done:
+            return
+
+        self.done = True
+        if self.callee is not None:
+            self.local_bus.interrupt(
+                self.callee, self._invocation_id, self.request_id,
+                self._responses,
+            )
+            return
+
+        self.session.abandon_request(self.request_id)
+
+        if self.session.router_supports('dealer', 'call_canceling'):
+            self.session.send_message(
+                Cancel(self.request_id, options={'mode': mode}))
+
+
+def call_key(procedure, args, kwargs):
+    """ Identifies a call by its procedure and arguments. """
+    # the arguments are serialized for the CALL anyway, so are known to
+    # be JSON, and sorting the keys makes the order of keyword arguments
+    # irrelevant
+    return json.dumps([procedure, args, kwargs], sort_keys=True)
+
+
+def call_and_wait(client, procedure, args, kwargs, timeout):
+    """ Make a call for the Client and wait for its final response.
+
+    The response may instead come from the Client's ``result_cache``, see
+    :class:`wampy.roles.cache.ResultCache`, which is then given any
+    RESULT that does not.
+
+    With the Client's ``coalesce_calls`` a call identical to one still
+    in flight is not made again: it waits on the first and is given the
+    same response, or has the same exception raised. It waits no longer
+    than the call ``timeout`` for it.
+    """
+    cache = client.result_cache
+    if cache is not None and not cache.caches(procedure):
+        cache = None
+
+    if cache is None and not client.coalesce_calls:
+        pending = PendingCall(
+            client.session, procedure, args=args, kwargs=kwargs,
+            timeout=timeout, local_bus=client.local_bus,
+        )
+        return pending.wait()
+
+    key = call_key(procedure, args, kwargs)
+    if cache is not None:
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+    in_flight = None
+    if client.coalesce_calls:
+        in_flight = client.calls_in_flight.get(key)
+        if in_flight is not None:
+            client.session.stats['coalesced_calls'] += 1
+            error = WampyTimeOutError(
+                "no response to call of \"{}\" within {}s".format(
+                    procedure, timeout)
+            )
+            with eventlet.Timeout(timeout, error):
+                return in_flight.wait()
+
+        in_flight = client.calls_in_flight[key] = Event()
+
+    try:
+        pending = PendingCall(
+            client.session, procedure, args=args, kwargs=kwargs,
+            timeout=timeout, local_bus=client.local_bus,
+        )
+        response = pending.wait()
+    except Exception as exc:
+        if in_flight is not None:
+            in_flight.send_exception(exc)
+        raise
+    else:
+        if in_flight is not None:
+            in_flight.send(response)
+    finally:
+        if in_flight is not None:
+            del client.calls_in_flight[key]
+            if not in_flight.ready():
+                # the call was killed, e.g. by its caller's own Timeout,
+                # and nothing is left to answer the calls waiting on it
+                in_flight.send_exception(WampyError(
+                    "call of \"{}\" was abandoned".format(procedure)))
+
+    # a wampy Callee answers a failure with a RESULT carrying the error
+    failed = len(response) > 4 and response[4].get('error')
+    if cache is not None and response[0] == Message.RESULT and not failed:
+        cache.put(key, procedure, response)
+
+    return response
+
+
 class CallProxy:
     """ Proxy wrapper of a `wampy` client for WAMP application RPCs.
 
@@ -19,14 +208,17 @@ class CallProxy:
     and a `CallProxy` object will call such and endpoint, passing in
     any `args` or `kwargs` necessary.
 
+    A :class:`wampy.errors.WampyTimeOutError` is raised if the call is
+    not answered within ``timeout`` seconds.
+
     """
-    def __init__(self, client):
+    def __init__(self, client, timeout=None):
         self.client = client
+        self.timeout = timeout
 
     def __call__(self, procedure, *args, **kwargs):
-        message = Call(procedure=procedure, args=args, kwargs=kwargs)
-        response = self.client.send_message_and_wait_for_response(
-            message)
+        response = call_and_wait(
+            self.client, procedure, args, kwargs, self.timeout)
         wamp_code = response[0]
 
         if wamp_code == Message.ERROR:
@@ -39,6 +231,35 @@ class CallProxy:
 
         raise WampProtocolError("unexpected response: %s", response)
 
+    def progressive(self, procedure, *args, **kwargs):
+        """ Call a procedure that streams its result and lazily iterate
+        over the chunks as they arrive. """
+        pending = PendingCall(
+            self.client.session, procedure, args=args, kwargs=kwargs,
+            timeout=self.timeout, receive_progress=True,
+            local_bus=self.client.local_bus,
+        )
+
+        try:
+            for response in pending:
+                wamp_code = response[0]
+                if wamp_code == Message.ERROR:
+                    raise WampyError(
+                        "call returned an error: {}".format(response))
+
+                # [RESULT, CALL.Request|id, Details|dict,
+                #  YIELD.Arguments|list, YIELD.ArgumentsKw|dict]
+                results = response[3] if len(response) > 3 else []
+                result_kwargs = response[4] if len(response) > 4 else {}
+                if result_kwargs.get('error'):
+                    raise WampyError(result_kwargs['error'])
+
+                if results:
+                    yield results[0]
+        finally:
+            # the caller stopped iterating early, so stop the stream
+            pending.cancel()
+
 
 class RpcProxy:
     """ Proxy wrapper of a `wampy` client for WAMP application RPCs
@@ -51,15 +272,15 @@ class RpcProxy:
     where endpoints are class methods.
 
     """
-    def __init__(self, client):
+    def __init__(self, client, timeout=None):
         self.client = client
+        self.timeout = timeout
 
     def __getattr__(self, name):
 
         def wrapper(*args, **kwargs):
-            message = Call(procedure=name, args=args, kwargs=kwargs)
-            response = self.client.send_message_and_wait_for_response(
-                message)
+            response = call_and_wait(
+                self.client, name, args, kwargs, self.timeout)
             wamp_code = response[0]
             if wamp_code != Message.RESULT:
                 raise WampProtocolError(
@@ -0,0 +1,303 @@
+import logging
+from collections import OrderedDict
+from time import time as now
+
+import eventlet
+from eventlet.queue import Empty
+from eventlet.semaphore import Semaphore
+
+from wampy.errors import WampyError
+
+
+logger = logging.getLogger('wampy.dispatcher')
+
+DEFAULT_MAX_QUEUE_SIZE = 1000
+# milliseconds a batch of events is held open for more to join it
+DEFAULT_LINGER_MS = 10
+
+
+class EventDispatcher(object):
+    """ Runs subscription handlers off the green thread reading from
+    the connection.
+
+    Events are partitioned by a key - the topic by default - and each
+    partition is pinned to one of ``parallelism`` lanes. A lane is a
+    green thread consuming its own bounded queue, so events that share
+    a key are handled strictly in the order they arrived, whilst events
+    with different keys are handled concurrently.
+
+    When a lane's queue is full the reader blocks, which stops reads
+    from the socket and pushes back on the Router rather than buffering
+    without limit.
+
+    """
+
+    def __init__(
+            self, parallelism=1, partition_key=None,
+            max_queue_size=DEFAULT_MAX_QUEUE_SIZE, executor=None,
+    ):
+        """
+        :Parameters:
+            parallelism : int
+                The number of lanes, i.e. the maximum number of handlers
+                running at the same time.
+            partition_key : func
+                Called with the same arguments as the handler and must
+                return a hashable key. Events with the same key are
+                always handled in order. Defaults to the topic.
+            max_queue_size : int
+                The maximum number of events waiting on each lane.
+            executor : instance
+                Optionally run handlers with an executor from
+                :mod:`wampy.roles.executors` rather than on the lane.
+
+        """
+        if parallelism < 1:
+            raise WampyError(
+                "parallelism must be at least 1, not {}".format(parallelism)
+            )
+
+        self.parallelism = parallelism
+        self.partition_key = partition_key
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+
+        self._lanes = []
+        self._threads = []
+        # events dispatched and not yet handled
+        self.pending = 0
+
+    @property
+    def started(self):
+        return bool(self._threads)
+
+    def start(self):
+        for _ in range(self.parallelism):
+            lane = eventlet.Queue(maxsize=self.max_queue_size)
+            self._lanes.append(lane)
+            self._threads.append(eventlet.spawn(self._consume, lane))
+
+    def stop(self):
+        for gthread in self._threads:
+            gthread.kill()
+
+        self._lanes = []
+        self._threads = []
+        self.pending = 0
+
+        if self.executor is not None:
+            self.executor.stop()
+
+    def get_partition(self, args, kwargs):
+        if self.partition_key is None:
+            return kwargs['_meta']['topic']
+        return self.partition_key(*args, **kwargs)
+
+    def dispatch(self, handler, args, kwargs):
+        key = self.get_partition(args, kwargs)
+        lane = self._lanes[hash(key) % self.parallelism]
+        self.pending += 1
+        lane.put((handler, args, kwargs))
+
+    def _consume(self, lane):
+        while True:
+            handler, args, kwargs = lane.get()
+            try:
+                if self.executor is None:
+                    handler(*args, **kwargs)
+                else:
+                    self.executor.execute(handler, args, kwargs)
+            except Exception:
+                logger.exception("event handler failed: %s", handler)
+            finally:
+                self.pending -= 1
+
+
+class EventBatcher(object):
+    """ Hands a subscription handler its events in batches, for handlers
+    of high-rate topics that would rather vectorise their work than be
+    called once per event.
+
+    The handler is called with a list of events. Each event is a dict
+    of its keyword arguments with its ``_meta``, and with ``_args``
+    holding any positional arguments it was published with. A batch is
+    flushed once it has ``batch_size`` events, or ``linger_ms`` after
+    its first event arrived, whichever comes first.
+
+    Batches are handled one at a time, in order, on a green thread of
+    their own - or with the ``executor`` given. The reader blocks once
+    ``max_queue_size`` events are waiting, as for the
+    :class:`EventDispatcher`.
+
+    """
+
+    def __init__(
+            self, batch_size, linger_ms=DEFAULT_LINGER_MS,
+            max_queue_size=DEFAULT_MAX_QUEUE_SIZE, executor=None,
+    ):
+        if batch_size < 1:
+            raise WampyError(
+                "batch_size must be at least 1, not {}".format(batch_size)
+            )
+
+        self.batch_size = batch_size
+        self.linger_ms = linger_ms
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+
+        self._queue = None
+        self._gthread = None
+        # events dispatched and not yet handled
+        self.pending = 0
+
+    @property
+    def started(self):
+        return self._gthread is not None
+
+    def start(self):
+        self._queue = eventlet.Queue(maxsize=self.max_queue_size)
+        self._gthread = eventlet.spawn(self._consume)
+
+    def stop(self):
+        if self._gthread is not None:
+            self._gthread.kill()
+
+        self._queue = None
+        self._gthread = None
+        self.pending = 0
+
+        if self.executor is not None:
+            self.executor.stop()
+
+    def dispatch(self, handler, args, kwargs):
+        event = kwargs
+        if args:
+            event = dict(kwargs, _args=args)
+
+        self.pending += 1
+        self._queue.put((handler, event))
+
+    def _consume(self):
+        while True:
+            handler, event = self._queue.get()
+            events = [event]
+            deadline = now() + self.linger_ms / 1000.0
+
+            while len(events) < self.batch_size:
+                try:
+                    _, event = self._queue.get(
+                        timeout=max(0, deadline - now()))
+                except Empty:
+                    break
+                events.append(event)
+
+            try:
+                if self.executor is None:
+                    handler(events)
+                else:
+                    self.executor.execute(handler, [events], {})
+            except Exception:
+                logger.exception("event handler failed: %s", handler)
+            finally:
+                self.pending -= len(events)
+
+
+class EventConflater(object):
+    """ Hands a subscription handler only the latest event for each key,
+    for handlers that care about the current state of a topic rather
+    than every change to it, e.g. prices rendered on a dashboard.
+
+    Events are handled one at a time on a green thread of their own -
+    or with the ``executor`` given. While the handler is busy, an event
+    replaces any waiting with the same key, which is then never handled,
+    and is counted in ``conflated``. Keys are handled in the order they
+    first became waiting, so a busy key cannot starve the others.
+
+    Nothing is queued beyond one event per key, so the reader is never
+    held up.
+
+    """
+
+    def __init__(self, key=None, executor=None, stats=None):
+        """
+        :Parameters:
+            key : func
+                Called with the same arguments as the handler and must
+                return a hashable key. Defaults to the topic.
+            executor : instance
+                Optionally run the handler with an executor from
+                :mod:`wampy.roles.executors`.
+            stats : Counter
+                Where to also count the ``conflated_events``, e.g. the
+                Session's ``stats``.
+
+        """
+        self.key = key
+        self.executor = executor
+        self.stats = stats
+
+        # events replaced before they were handled
+        self.conflated = 0
+        # events dispatched and not yet handled
+        self.pending = 0
+
+        # key -> (handler, args, kwargs), waiting longest first
+        self._latest = OrderedDict()
+        self._ready = None
+        self._gthread = None
+
+    @property
+    def started(self):
+        return self._gthread is not None
+
+    def start(self):
+        # released once for each key that becomes waiting
+        self._ready = Semaphore(0)
+        self._gthread = eventlet.spawn(self._consume)
+
+    def stop(self):
+        if self._gthread is not None:
+            self._gthread.kill()
+
+        self._latest.clear()
+        self._ready = None
+        self._gthread = None
+        self.pending = 0
+
+        if self.executor is not None:
+            self.executor.stop()
+
+    def get_key(self, args, kwargs):
+        if self.key is None:
+            return kwargs['_meta']['topic']
+        return self.key(*args, **kwargs)
+
+    def dispatch(self, handler, args, kwargs):
+        key = self.get_key(args, kwargs)
+
+        if key in self._latest:
+            # keeps its place in the line
+            self._latest[key] = handler, args, kwargs
+            self.conflated += 1
+            if self.stats is not None:
+                self.stats['conflated_events'] += 1
+            return
+
+        self._latest[key] = handler, args, kwargs
+        self.pending += 1
+        self._ready.release()
+
+    def _consume(self):
+        while True:
+            self._ready.acquire()
+            _, (handler, args, kwargs) = self._latest.popitem(last=False)
+
+            try:
+                if self.executor is None:
+                    handler(*args, **kwargs)
+                else:
+                    self.executor.execute(handler, args, kwargs)
+            except Exception:
+                logger.exception("event handler failed: %s", handler)
+            finally:
+                self.pending -= 1
@@ -0,0 +1,356 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+from importlib import import_module
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from time import time as now
+
+import eventlet
+import greenlet
+from eventlet import tpool
+from eventlet.event import Event
+from eventlet.queue import Empty
+from eventlet.semaphore import Semaphore
+
+from wampy.errors import WampyError
+
+
+logger = logging.getLogger('wampy.executors')
+
+# pickled arguments larger than this are handed to a worker process
+# through shared memory rather than being pushed down its pipe
+SHARED_MEMORY_THRESHOLD = 1 << 20
+SHARED_MEMORY_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# the most invocations of a batched procedure gathered into one call
+DEFAULT_MAX_BATCH = 64
+# milliseconds a batch is held open for more invocations to join it
+DEFAULT_MAX_WAIT_MS = 5
+
+
+def pack(obj, threshold=SHARED_MEMORY_THRESHOLD):
+    data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+    if len(data) < threshold:
+        return False, data
+
+    fd, path = tempfile.mkstemp(prefix="wampy-", dir=SHARED_MEMORY_DIR)
+    with os.fdopen(fd, "wb") as shared_memory:
+        shared_memory.write(data)
+
+    return True, path
+
+
+def unpack(shared, data):
+    if not shared:
+        return pickle.loads(data)
+
+    try:
+        with open(data, "rb") as shared_memory:
+            return pickle.loads(shared_memory.read())
+    finally:
+        os.unlink(data)
+
+
+def close_inherited_fds(keep):
+    # a forked worker must not hold the parent's WebSocket open, else the
+    # Router never sees the connection drop if the parent dies
+    try:
+        max_fd = os.sysconf("SC_OPEN_MAX")
+    except (AttributeError, ValueError):
+        max_fd = 1024
+
+    low = 3
+    for fd in sorted(keep):
+        os.closerange(low, fd)
+        low = fd + 1
+    os.closerange(low, max_fd)
+
+
+def _serve(tasks, results):
+    """ The main loop of a worker process. """
+    close_inherited_fds(keep=[tasks.fileno(), results.fileno()])
+
+    while True:
+        try:
+            shared, payload = tasks.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        try:
+            module_name, class_name, procedure_name, args, kwargs = unpack(
+                shared, payload)
+            cls = getattr(import_module(module_name), class_name)
+            # there is no Session in the worker, so procedures run against
+            # an uninitialised instance and must only rely on their args
+            instance = cls.__new__(cls)
+            result = getattr(instance, procedure_name)(*args, **kwargs)
+            results.send((True, result))
+        except Exception as exc:
+            results.send((False, str(exc)))
+
+
+class Worker(object):
+
+    def __init__(self):
+        tasks_reader, self.tasks = multiprocessing.Pipe(duplex=False)
+        self.results, results_writer = multiprocessing.Pipe(duplex=False)
+
+        self.process = multiprocessing.Process(
+            target=_serve, args=(tasks_reader, results_writer))
+        self.process.daemon = True
+        self.process.start()
+
+        tasks_reader.close()
+        results_writer.close()
+
+    def round_trip(self, task):
+        # blocking pipe I/O - only ever called from an OS thread
+        self.tasks.send(task)
+        return self.results.recv()
+
+    def stop(self):
+        self.tasks.close()
+        self.results.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def kill(self):
+        # the pipes are left to the garbage collector as an OS thread may
+        # still be blocked reading from them
+        self.process.terminate()
+
+
+class ProcessExecutor(object):
+    """ Run a procedure in a pool of worker processes so that CPU bound
+    work is not bound by the GIL of the process running the Client.
+
+    Pipe I/O happens on an OS thread via ``eventlet.tpool`` so the hub
+    carries on serving the Session whilst a worker is busy.
+
+    Procedures are looked up by name on the Client's class in the
+    worker, so the class must be importable from its module.
+
+    """
+
+    def __init__(
+            self, workers=None,
+            shared_memory_threshold=SHARED_MEMORY_THRESHOLD,
+    ):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.shared_memory_threshold = shared_memory_threshold
+
+        self._pool = []
+        self._idle = eventlet.Queue()
+
+    def start(self):
+        for _ in range(self.workers):
+            worker = Worker()
+            self._pool.append(worker)
+            self._idle.put(worker)
+
+        logger.info("started %s worker processes", self.workers)
+
+    def stop(self):
+        for worker in self._pool:
+            worker.stop()
+
+        self._pool = []
+        self._idle = eventlet.Queue()
+
+    def execute(self, procedure, args, kwargs):
+        cls = procedure.im_self.__class__
+        shared, payload = pack(
+            (cls.__module__, cls.__name__, procedure.__name__, args, kwargs),
+            threshold=self.shared_memory_threshold,
+        )
+
+        worker = self._idle.get()
+        try:
+            succeeded, result = tpool.execute(
+                worker.round_trip, (shared, payload))
+        except (EOFError, IOError) as exc:
+            logger.error("worker process died: %s", exc)
+            worker = self._replace(worker)
+            raise WampyError("worker process died: {}".format(exc))
+        except greenlet.GreenletExit:
+            # the invocation was interrupted, so stop the work using the CPU
+            logger.info("killing interrupted worker process")
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+            if shared and os.path.exists(payload):
+                os.unlink(payload)
+
+        if not succeeded:
+            raise WampyError(result)
+
+        return result
+
+    def _replace(self, worker):
+        worker.kill()
+        self._pool.remove(worker)
+
+        replacement = Worker()
+        self._pool.append(replacement)
+        return replacement
+
+
+class ThreadExecutor(object):
+    """ Run a procedure or handler on an OS thread from ``eventlet.tpool``.
+
+    This is for bodies that block in C extensions or database drivers
+    which release the GIL: the hub, and so every other green thread in
+    the process, carries on whilst they run. They must not use green I/O
+    themselves, e.g. the Client's Session.
+
+    ``workers`` bounds how many threads this executor occupies at once;
+    the ``tpool`` itself is shared by the process and is sized with the
+    ``EVENTLET_THREADPOOL_SIZE`` environment variable.
+
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self._semaphore = None
+
+    def start(self):
+        if self.workers:
+            self._semaphore = Semaphore(self.workers)
+
+    def stop(self):
+        self._semaphore = None
+
+    def execute(self, procedure, args, kwargs):
+        if self._semaphore is None:
+            return tpool.execute(procedure, *args, **kwargs)
+
+        with self._semaphore:
+            return tpool.execute(procedure, *args, **kwargs)
+
+
+class BatchExecutor(object):
+    """ Gather concurrent invocations of a batched procedure into one
+    call, for a Callee that is far faster per item when it processes
+    many at once, e.g. as a NumPy array.
+
+    Each invocation must pass the procedure a single positional
+    argument. The first invocation to arrive opens a batch, which then
+    waits ``max_wait_ms`` for up to ``max_batch`` invocations in all.
+    The procedure is called with the list of their arguments and must
+    return a list with one result for each, in the same order. Each
+    invocation then YIELDs its own result. If the call raises, every
+    invocation in the batch is answered with the error.
+
+    Invocations arriving while a batch runs make up the next one. The
+    batch runs on the ``executor`` given, if any, e.g. a
+    :class:`ThreadExecutor`.
+
+    """
+
+    def __init__(
+            self, max_batch=DEFAULT_MAX_BATCH,
+            max_wait_ms=DEFAULT_MAX_WAIT_MS, executor=None,
+    ):
+        if max_batch < 1:
+            raise WampyError(
+                "max_batch must be at least 1, not: {}".format(max_batch))
+
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+
+        self._pending = eventlet.Queue()
+        # the batch gathered or running, no longer in ``_pending``
+        self._batch = []
+        self._gthread = None
+
+    def start(self):
+        self._gthread = eventlet.spawn(self._gather)
+
+    def stop(self):
+        if self._gthread is not None:
+            self._gthread.kill()
+            self._gthread = None
+
+        batch, self._batch = self._batch, []
+        while not self._pending.empty():
+            batch.append(self._pending.get_nowait())
+
+        for _, _, result in batch:
+            if not result.ready():
+                result.send_exception(WampyError("batch executor stopped"))
+
+        if self.executor is not None:
+            self.executor.stop()
+
+    def execute(self, procedure, args, kwargs):
+        if len(args) != 1 or kwargs:
+            raise WampyError(
+                "a batched procedure takes a single positional argument, "
+                "not: {}, {}".format(args, kwargs)
+            )
+
+        result = Event()
+        self._pending.put((procedure, args[0], result))
+        return result.wait()
+
+    def _gather(self):
+        while True:
+            batch = self._batch = [self._pending.get()]
+            deadline = now() + self.max_wait_ms / 1000.0
+
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._pending.get(
+                        timeout=max(0, deadline - now())))
+                except Empty:
+                    break
+
+            self._run(batch)
+            self._batch = []
+
+    def _run(self, batch):
+        procedure = batch[0][0]
+        items = [item for _, item, _ in batch]
+
+        try:
+            if self.executor is None:
+                results = procedure(items)
+            else:
+                results = self.executor.execute(procedure, [items], {})
+
+            results = list(results)
+            if len(results) != len(items):
+                raise WampyError(
+                    "{} returned {} results for a batch of {}".format(
+                        procedure.__name__, len(results), len(items))
+                )
+        except Exception as exc:
+            logger.exception("batch of %s failed", len(items))
+            for _, _, result in batch:
+                result.send_exception(exc)
+            return
+
+        logger.debug("ran a batch of %s", len(items))
+        for (_, _, result), value in zip(batch, results):
+            result.send(value)
+
+
+def executor_builder(executor, workers=None):
+    if executor == "process":
+        executor = ProcessExecutor(workers=workers)
+    elif executor == "thread":
+        executor = ThreadExecutor(workers=workers)
+    else:
+        raise WampyError("executor not supported: {}".format(executor))
+
+    executor.start()
+    return executor
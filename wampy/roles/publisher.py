@@ -25,7 +25,18 @@ class PublishProxy:
                 "wampy requires at least one message to publish to a topic"
             )
 
-        message = Publish(topic=topic, options={}, **kwargs)
+        options = {}
+        session = self.client.session
+        local_bus = self.client.local_bus
+        if local_bus is not None and session.router_supports(
+                'broker', 'subscriber_blackwhite_listing'):
+            # the Sessions in this process have the event straight away,
+            # and the Router is only needed for the rest
+            reached = local_bus.publish(self.client, topic, kwargs=kwargs)
+            if reached:
+                options['exclude'] = reached
+
+        message = Publish(topic=topic, options=options, **kwargs)
         logger.info('publishing message: "%s"', message)
 
         self.client.send_message(message)
@@ -0,0 +1,155 @@
+import logging
+
+import eventlet
+from eventlet.queue import Empty, Full
+
+from wampy.constants import BLOCK, DROP_OLDEST
+from wampy.errors import WampyError
+from wampy.roles.dispatcher import DEFAULT_MAX_QUEUE_SIZE
+from wampy.topics import EXACT
+
+logger = logging.getLogger('wampy.stream')
+
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST)
+
+
+class EventStream(object):
+    """ The events of a topic as an iterator, for consumers written as
+    plain loops rather than callbacks. ::
+
+        with client.stream("ticks", maxsize=100) as events:
+            for event in events:
+                ...
+
+    The stream subscribes when entered and unsubscribes when left. Each
+    event is a dict of its keyword payload with its ``_meta``, and with
+    ``_args`` holding any positional payload.
+
+    Events are buffered for the consumer up to ``maxsize``. When the
+    buffer is full and the ``overflow`` is "block", the reader waits for
+    the consumer, which stops reads from the socket and pushes back on
+    the Router. With "drop_oldest" the reader never waits: the oldest
+    event is dropped instead, and counted in ``dropped``.
+
+    """
+
+    def __init__(
+            self, client, topic, maxsize=DEFAULT_MAX_QUEUE_SIZE,
+            overflow=BLOCK, match=EXACT,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise WampyError(
+                "overflow must be one of {}, not: {}".format(
+                    ", ".join(OVERFLOW_POLICIES), overflow)
+            )
+        if maxsize < 1:
+            raise WampyError(
+                "maxsize must be at least 1, not: {}".format(maxsize))
+
+        self.client = client
+        self.topic = topic
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.match = match
+
+        # events dropped because the consumer fell behind
+        self.dropped = 0
+
+        self._buffer = eventlet.Queue(maxsize=maxsize)
+        self._subscription = None
+        self._closed = False
+
+    def __enter__(self):
+        self._subscription = self.client.subscribe(
+            self.topic, self._receive, match=self.match)
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __len__(self):
+        """ The number of events waiting for the consumer. """
+        return self._buffer.qsize()
+
+    def next(self):
+        event = self.get()
+        if event is None:
+            raise StopIteration
+        return event
+
+    __next__ = next
+
+    def get(self, timeout=None):
+        """ The next event, waiting up to ``timeout`` seconds for one.
+
+        Raises ``eventlet.queue.Empty`` if none arrives in time, and
+        returns ``None`` once the stream is closed.
+        """
+        if self._closed:
+            return None
+
+        event = self._buffer.get(timeout=timeout)
+        if self._closed:
+            return None
+        return event
+
+    def close(self):
+        """ Unsubscribe and end the iteration. """
+        if self._closed:
+            return
+
+        self._closed = True
+        # events arriving from now on are ignored, and those waiting are
+        # discarded so that a reader blocked on a full buffer carries on
+        # and can read the UNSUBSCRIBED
+        self._discard()
+
+        subscription, self._subscription = self._subscription, None
+        if subscription is not None and self.client.session.connected:
+            self.client.unsubscribe(subscription)
+
+        self._discard()
+        try:
+            # wakes a consumer waiting on the empty buffer
+            self._buffer.put_nowait(None)
+        except Full:
+            # so nobody is waiting
+            pass
+
+    def _discard(self):
+        while True:
+            try:
+                self._buffer.get_nowait()
+            except Empty:
+                return
+
+    def _receive(self, *args, **kwargs):
+        if self._closed:
+            return
+
+        event = kwargs
+        if args:
+            event['_args'] = list(args)
+
+        if self.overflow == BLOCK:
+            self._buffer.put(event)
+            return
+
+        while True:
+            try:
+                self._buffer.put_nowait(event)
+                return
+            except Full:
+                pass
+
+            try:
+                self._buffer.get_nowait()
+            except Empty:
+                continue
+
+            self.dropped += 1
+            self.client.session.stats['dropped_events'] += 1
+            logger.debug('stream of "%s" dropped an event', self.topic)
@@ -4,35 +4,234 @@ from uuid import uuid4
 from wampy.errors import WampyError, WampProtocolError
 from wampy.messages import Message
 from wampy.messages.subscribe import Subscribe
+from wampy.messages.unsubscribe import Unsubscribe
+from wampy.roles.dispatcher import (
+    EventBatcher, EventConflater, EventDispatcher, DEFAULT_LINGER_MS,
+    DEFAULT_MAX_QUEUE_SIZE)
+from wampy.roles.executors import executor_builder
 from wampy.session import session_builder
+from wampy.topics import EXACT, breadth, covers, validate_match
 
 logger = logging.getLogger(__name__)
 
 
-def subscribe_to_topic(session, topic, handler):
-    procedure_name = handler.func_name
-    message = Subscribe(topic=topic)
+def subscribe_to_topic(
+        session, topic, handler, parallelism=None, partition_key=None,
+        max_queue_size=DEFAULT_MAX_QUEUE_SIZE, executor=None, match=EXACT,
+        batch_size=None, linger_ms=DEFAULT_LINGER_MS, conflate=False,
+        key=None,
+):
+    subscribe_to_topics(session, [{
+        'topic': topic,
+        'handler': handler,
+        'parallelism': parallelism,
+        'partition_key': partition_key,
+        'max_queue_size': max_queue_size,
+        'executor': executor,
+        'match': match,
+        'batch_size': batch_size,
+        'linger_ms': linger_ms,
+        'conflate': conflate,
+        'key': key,
+    }])
+
+
+def subscribe_to_topics(session, subscriptions):
+    """ Subscribe to many topics for the price of one round trip.
+
+    Every SUBSCRIBE is sent before any SUBSCRIBED is waited on, and the
+    two are correlated by request ID.
+
+    A topic already covered by a broader pattern - one subscribed to
+    before or in this same batch - is not subscribed to again: its
+    handler shares the broader subscription and the Session's topic
+    trie picks the handlers for each event, so the Router sends the
+    event once rather than once per matching subscription.
+
+    :Parameters:
+        session : instance
+            The :class:`wampy.session.Session` to subscribe on.
+        subscriptions : list of dicts
+            The keyword arguments to :func:`subscribe_to_topic` for
+            each subscription, less the ``session``.
+
+    """
+    subscriptions = sorted(
+        subscriptions, key=lambda subscription: breadth(
+            subscription['topic'], subscription.get('match', EXACT)),
+    )
+
+    # the (topic, match) of the Router subscription each one will share
+    keys = []
+    new_keys = []
+    for subscription in subscriptions:
+        topic = subscription['topic']
+        match = subscription.get('match', EXACT)
+        validate_match(match)
+
+        modes = [
+            mode for mode, requested in (
+                ('parallelism', subscription.get('parallelism') is not None),
+                ('batch_size', subscription.get('batch_size') is not None),
+                ('conflate', subscription.get('conflate')),
+            ) if requested
+        ]
+        if len(modes) > 1:
+            # batched and conflated events are handled one at a time
+            raise WampyError(
+                "a handler of {} cannot be given both {}".format(
+                    topic, " and ".join(modes))
+            )
+
+        for key in session.router_subscriptions.keys() + new_keys:
+            if covers(key[0], key[1], topic, match):
+                break
+        else:
+            key = topic, match
+            new_keys.append(key)
+
+        keys.append(key)
+
+    messages = [
+        Subscribe(
+            topic=topic,
+            options={} if match == EXACT else {'match': match},
+        )
+        for topic, match in new_keys
+    ]
+
+    # handlers of topics covered by a subscription already made are
+    # ready straight away, and the rest as each SUBSCRIBED is read, as
+    # the Broker may send events for it before the others are answered
+    for subscription, key in zip(subscriptions, keys):
+        if key not in new_keys:
+            _subscribed(
+                session, session.router_subscriptions[key], **subscription)
+
+    def subscribed(index, response_msg):
+        if response_msg[0] != Message.SUBSCRIBED:
+            return
+
+        key = new_keys[index]
+        subscription_id = response_msg[2]
+        session.router_subscriptions[key] = subscription_id
+        for subscription, subscription_key in zip(subscriptions, keys):
+            if subscription_key == key:
+                _subscribed(session, subscription_id, **subscription)
 
     try:
-        session.send_message(message)
-        response_msg = session.recv_message()
+        responses = session.request_all(messages, on_response=subscribed)
     except Exception as exc:
         raise WampProtocolError(
             "failed to subscribe to {}: \"{}\"".format(
-                topic, exc)
+                ", ".join(message.topic for message in messages), exc)
         )
 
-    wamp_code, _, subscription_id = response_msg
-    if wamp_code != Message.SUBSCRIBED:
+    for (topic, match), response_msg in zip(new_keys, responses):
+        if response_msg is None:
+            raise WampProtocolError(
+                "failed to subscribe to {}: \"no response\"".format(topic)
+            )
+
+        wamp_code = response_msg[0]
+        if wamp_code != Message.SUBSCRIBED:
+            raise WampProtocolError(
+                "failed to subscribe to {}: \"{}\"".format(
+                    topic, wamp_code)
+            )
+
+
+def unsubscribe_from_topic(session, handler_name):
+    """ Detach a handler, and UNSUBSCRIBE from the Router if it was the
+    last handler on its subscription.
+
+    :Parameters:
+        session : instance
+            The :class:`wampy.session.Session` the handler was
+            subscribed on.
+        handler_name : string
+            The name the handler was subscribed under.
+
+    """
+    subscription_id = session.remove_subscription(handler_name)
+    if subscription_id is None:
+        logger.info('removed handler "%s"', handler_name)
+        return
+
+    response_msg, = session.request_all(
+        [Unsubscribe(subscription_id=subscription_id)])
+
+    if response_msg is None or response_msg[0] != Message.UNSUBSCRIBED:
         raise WampProtocolError(
-            "failed to subscribe to {}: \"{}\"".format(
-                topic, wamp_code)
+            "failed to unsubscribe from {}: \"{}\"".format(
+                subscription_id, response_msg)
         )
 
-    session.subscription_map[subscription_id] = procedure_name, topic
+    session.forget_subscription(subscription_id)
 
     logger.info(
-        'registered handler "%s" for topic "%s"', procedure_name, topic
+        'removed handler "%s" and unsubscribed from %s',
+        handler_name, subscription_id,
+    )
+
+
+class Subscription(object):
+    """ A handler subscribed with :meth:`wampy.peers.clients.Client.subscribe`,
+    to be passed to :meth:`wampy.peers.clients.Client.unsubscribe`. """
+
+    def __init__(self, name, topic, match, handler):
+        self.name = name
+        self.topic = topic
+        self.match = match
+        self.handler = handler
+
+    def __repr__(self):
+        return "<Subscription {} to {} ({})>".format(
+            self.name, self.topic, self.match)
+
+
+def _subscribed(
+        session, subscription_id, topic, handler, parallelism=None,
+        partition_key=None, max_queue_size=DEFAULT_MAX_QUEUE_SIZE,
+        executor=None, match=EXACT, name=None, batch_size=None,
+        linger_ms=DEFAULT_LINGER_MS, conflate=False, key=None,
+):
+    # a handler other than one of the Client's own methods is told apart
+    # by the name it is given
+    procedure_name = name or handler.func_name
+
+    if executor is not None:
+        # the executor is fed from a dispatcher lane so that events keep
+        # their order and the reader is never blocked on the handler
+        executor = executor_builder(executor, workers=parallelism)
+        parallelism = parallelism or 1
+
+    dispatcher = None
+    if conflate:
+        dispatcher = EventConflater(
+            key=key, executor=executor, stats=session.stats)
+        dispatcher.start()
+    elif batch_size is not None:
+        dispatcher = EventBatcher(
+            batch_size=batch_size, linger_ms=linger_ms,
+            max_queue_size=max_queue_size, executor=executor,
+        )
+        dispatcher.start()
+    elif parallelism is not None:
+        dispatcher = EventDispatcher(
+            parallelism=parallelism, partition_key=partition_key,
+            max_queue_size=max_queue_size, executor=executor,
+        )
+        dispatcher.start()
+
+    session.add_subscription(
+        procedure_name, topic, subscription_id, dispatcher, match,
+        handler if name else None,
+    )
+
+    logger.info(
+        'registered handler "%s" for topic "%s" (%s)',
+        procedure_name, topic, match,
     )
 
 
@@ -45,6 +244,30 @@ class RegisterSubscriptionDecorator(object):
             )
 
         self.topic = kwargs['topic']
+        # "exact", else "prefix" or "wildcard", see :mod:`wampy.topics`
+        self.match = kwargs.get('match', EXACT)
+        validate_match(self.match)
+        # handlers run on the reader unless a degree of parallelism is
+        # requested, see :class:`wampy.roles.dispatcher.EventDispatcher`
+        self.parallelism = kwargs.get('parallelism')
+        self.partition_key = kwargs.get('partition_key')
+        self.max_queue_size = kwargs.get(
+            'max_queue_size', DEFAULT_MAX_QUEUE_SIZE)
+        # the handler is given lists of events rather than each one, see
+        # :class:`wampy.roles.dispatcher.EventBatcher`
+        self.batch_size = kwargs.get('batch_size')
+        self.linger_ms = kwargs.get('linger_ms', DEFAULT_LINGER_MS)
+        # only the latest event of each key is handled, see
+        # :class:`wampy.roles.dispatcher.EventConflater`
+        self.conflate = kwargs.get('conflate', False)
+        self.key = kwargs.get('key')
+
+        self.executor = kwargs.get('executor')
+        if self.executor not in (None, "thread"):
+            raise WampyError(
+                "subscribers only support the thread executor, not: "
+                "{}".format(self.executor)
+            )
 
     def __call__(self, f):
         def wrapped_f(*args, **kwargs):
@@ -52,7 +275,16 @@ class RegisterSubscriptionDecorator(object):
 
         wrapped_f.subscriber = True
         wrapped_f.topic = self.topic
+        wrapped_f.match = self.match
         wrapped_f.handler = f
+        wrapped_f.parallelism = self.parallelism
+        wrapped_f.partition_key = self.partition_key
+        wrapped_f.max_queue_size = self.max_queue_size
+        wrapped_f.executor = self.executor
+        wrapped_f.batch_size = self.batch_size
+        wrapped_f.linger_ms = self.linger_ms
+        wrapped_f.conflate = self.conflate
+        wrapped_f.key = self.key
         return wrapped_f
 
 subscribe = RegisterSubscriptionDecorator
@@ -63,7 +295,7 @@ class TopicSubscriber(object):
 
     def __init__(
             self, router, realm, topics, message_handler,
-            roles=None, transport="ws",
+            roles=None, transport="ws", match=EXACT,
     ):
         """ Subscribe to a single topic.
 
@@ -77,6 +309,9 @@ class TopicSubscriber(object):
             topics : list of strings
             message_handler : func
             roles: dictionary
+            match : string
+                How the ``topics`` are matched: "exact", "prefix" or
+                "wildcard".
 
         """
         self.id = str(uuid4())
@@ -90,6 +325,7 @@ class TopicSubscriber(object):
             },
         }
         self.transport = transport
+        self.match = match
 
         self.session = session_builder(
             client=self, router=self.router, realm=self.realm,
@@ -104,10 +340,11 @@ class TopicSubscriber(object):
 
     def start(self):
         self.session.begin()
-        for topic in self.topics:
-            subscribe_to_topic(
-                session=self.session, topic=topic, handler=self.topic_handler
-            )
+        subscribe_to_topics(self.session, [
+            {'topic': topic, 'handler': self.topic_handler,
+             'match': self.match}
+            for topic in self.topics
+        ])
 
         logger.info("subscribed to %s", ", ".join(self.topics))
 
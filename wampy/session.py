@@ -1,13 +1,33 @@
 import logging
+import random
+from collections import Counter, OrderedDict
+from functools import partial
+from time import time as now
 
 import eventlet
-
-from wampy.errors import ConnectionError, WampError, WampProtocolError
+from eventlet.queue import Empty
+
+from wampy.constants import (
+    ABANDONED_REQUEST_TTL, DEFAULT_DRAIN_TIMEOUT, DEFAULT_FLUSH_TIMEOUT,
+    DEFAULT_SEND_HIGH_WATER, DEFAULT_SEND_LOW_WATER, MAX_ABANDONED_REQUESTS,
+    RECONNECT_ATTEMPT_TIMEOUT, RECONNECT_INITIAL_DELAY, RECONNECT_MAX_DELAY,
+    RECONNECT_MULTIPLIER,
+)
+from wampy.errors import (
+    ConnectionError, WampError, WampProtocolError, WampyError,
+    WampyTimeOutError)
 from wampy.messages import Message
+from wampy.messages.error import Error
 from wampy.messages.handlers.default import MessageHandler
 from wampy.messages.hello import Hello
 from wampy.messages.goodbye import Goodbye
 from wampy.messages.authenticate import Authenticate
+from wampy.messages.register import Register
+from wampy.messages.subscribe import Subscribe
+from wampy.messages.unregister import Unregister
+from wampy.messages.unsubscribe import Unsubscribe
+from wampy.queues import InboundQueue, OutboundScheduler
+from wampy.topics import EXACT, TopicTrie, topic_matches
 from wampy.transports.websocket.connection import WebSocket, TLSWebSocket
 
 from wampy.messages import MESSAGE_TYPE_MAP
@@ -17,7 +37,10 @@ logger = logging.getLogger('wampy.session')
 
 
 def session_builder(
-        client, router, realm, transport="ws", message_handler=None, onchallenge=None
+        client, router, realm, transport="ws", message_handler=None,
+        onchallenge=None, reconnect=False, inbound_queue=None,
+        send_high_water=DEFAULT_SEND_HIGH_WATER,
+        send_low_water=DEFAULT_SEND_LOW_WATER,
 ):
     if transport == "ws":
         use_tls = router.can_use_tls
@@ -33,10 +56,29 @@ def session_builder(
 
     return Session(
         client=client, router=router, realm=realm, transport=transport,
-        message_handler=message_handler, onchallenge=onchallenge
+        message_handler=message_handler, onchallenge=onchallenge,
+        reconnect=reconnect, inbound_queue=inbound_queue,
+        send_high_water=send_high_water, send_low_water=send_low_water,
     )
 
 
+def backoff_delays(
+        initial=RECONNECT_INITIAL_DELAY, maximum=RECONNECT_MAX_DELAY,
+        multiplier=RECONNECT_MULTIPLIER,
+):
+    """ Generate the delays between reconnection attempts.
+
+    The ceiling grows exponentially up to ``maximum`` and each delay is
+    drawn uniformly from beneath it ("full jitter") so that a fleet of
+    Clients do not all stampede a restarted Router at the same moment.
+
+    """
+    ceiling = initial
+    while True:
+        yield random.uniform(0, ceiling)
+        ceiling = min(maximum, ceiling * multiplier)
+
+
 class Session(object):
     """ A transient conversation between two Peers attached to a
     Realm and running over a Transport.
@@ -56,7 +98,12 @@ class Session(object):
 
     """
 
-    def __init__(self, client, router, realm, transport, message_handler=None, onchallenge=None):
+    def __init__(
+            self, client, router, realm, transport, message_handler=None,
+            onchallenge=None, reconnect=False, inbound_queue=None,
+            send_high_water=DEFAULT_SEND_HIGH_WATER,
+            send_low_water=DEFAULT_SEND_LOW_WATER,
+    ):
         """ A Session between a Client and a Router.
 
         :Parameters:
@@ -68,6 +115,18 @@ class Session(object):
                 The name of the Realm on the ``router`` to join.
             transport : instance
                 An instance of :class:`transports.Transport`.
+            reconnect : bool
+                If the connection is lost, reconnect with exponential
+                backoff and restore the registrations and subscriptions
+                made on it.
+            inbound_queue : instance
+                A :class:`wampy.queues.InboundQueue` to keep the messages
+                received that nobody is yet waiting on. By default one
+                with the default limits.
+            send_high_water, send_low_water : int
+                The bytes of publications waiting to be sent at which
+                publishers are made to wait, and at which they carry on,
+                see :class:`wampy.queues.OutboundScheduler`.
 
         """
         self.client = client
@@ -75,16 +134,68 @@ class Session(object):
         self.realm = realm
         self.transport = transport
         self.onchallenge = onchallenge
+        self.reconnect = reconnect
 
         self.subscription_map = {}
         self.registration_map = {}
+        # dispatch tables, built once as each registration or
+        # subscription is made so that every INVOCATION and EVENT is
+        # routed with a single lookup:
+        #   registration ID -> (procedure name, callable, executor, memo)
+        #   subscription ID -> [
+        #       (handler, handler name, topic, match, dispatcher), ...]
+        # a subscription carries more than one handler when it covers
+        # the topics of others, which are then told apart by the trie
+        self.procedures = {}
+        self.handlers = {}
+        self.topic_trie = TopicTrie()
+        # (topic, match) -> subscription ID, one per pattern on the Router
+        self.router_subscriptions = {}
+        # handler name -> subscription ID
+        self.handler_subscriptions = {}
+        # handler name -> dispatcher
+        self.event_dispatchers = {}
+        self.executors = {}
+        # procedure name -> :class:`wampy.roles.cache.ProcedureMemo`
+        self.memos = {}
+        # green threads running INVOCATIONs, so they can be interrupted
+        self.running_invocations = {}
+        # event handlers running on the reader, i.e. without a dispatcher
+        self.running_handlers = 0
+        # whilst draining, events are dropped rather than handled
+        self.draining = False
+        # the options of the procedures the Client registered, so that
+        # they can be restored on a new connection
+        self.declared_procedures = {}
+        # seconds from losing the connection to restoring the Session
+        self.last_recovery_time = None
+        # running totals, e.g. of invocations and events handled
+        self.stats = Counter()
 
         self.session_id = None
+        self.router_details = {}
         # spawn a green thread to listen for incoming messages over
         # a connection and put them on a queue to be processed
         self._connection = None
         self._managed_thread = None
-        self._message_queue = eventlet.Queue()
+        self._recovery_thread = None
+        self._ending = False
+        if inbound_queue is None:
+            inbound_queue = InboundQueue()
+        self._message_queue = inbound_queue
+        # messages are written one at a time, most urgent first
+        self.outbound = OutboundScheduler(
+            send=self._send_frame, high_water=send_high_water,
+            low_water=send_low_water, stats=self.stats,
+        )
+        # responses are correlated with requests by request ID, and
+        # those of abandoned requests, e.g. calls that timed out, are
+        # dropped rather than mistaken for the answer to another:
+        #   request ID -> the time it is given up on, oldest first
+        self._requests = {}
+        self._abandoned_requests = OrderedDict()
+        # request ID -> called on the reader as the response arrives
+        self._response_callbacks = {}
 
         if message_handler is None:
             self.message_handler = MessageHandler(
@@ -110,26 +221,400 @@ class Session(object):
     def id(self):
         return self.session_id
 
+    @property
+    def connected(self):
+        """ Whether the Session has been welcomed by the Router and its
+        connection is still being read from. """
+        reader = self._managed_thread
+        return (
+            self.session_id is not None and
+            reader is not None and not reader.dead
+        )
+
     def begin(self):
+        self._ending = False
+        self.draining = False
         self._connect()
         self._say_hello()
 
     def end(self):
+        self._ending = True
+        if self._recovery_thread is not None:
+            self._recovery_thread.kill()
+            self._recovery_thread = None
+
+        # what was published before leaving is sent before the GOODBYE
+        self.outbound.flush(timeout=DEFAULT_FLUSH_TIMEOUT)
         self._say_goodbye()
         self._disconnet()
+        self._stop_dispatchers()
+        self._stop_executors()
+        self._kill_invocations()
+        self.memos = {}
         self.subscription_map = {}
         self.registration_map = {}
+        self.procedures = {}
+        self.handlers = {}
+        self.topic_trie = TopicTrie()
+        self.router_subscriptions = {}
+        self.handler_subscriptions = {}
+        self.running_handlers = 0
+        self.declared_procedures = {}
+        self._requests = {}
+        self._abandoned_requests = OrderedDict()
+        self._response_callbacks = {}
         self.session_id = None
+        self.router_details = {}
+
+    def add_registration(self, procedure_name, registration_id):
+        self.registration_map[procedure_name] = registration_id
+        self.procedures[registration_id] = (
+            procedure_name, getattr(self.client, procedure_name),
+            self.executors.get(procedure_name),
+            self.memos.get(procedure_name),
+        )
+
+    def add_subscription(
+            self, handler_name, topic, subscription_id, dispatcher=None,
+            match=EXACT, handler=None,
+    ):
+        """ Attach a handler to a subscription on the Router, which may
+        be for a pattern covering ``topic`` rather than ``topic`` itself.
+
+        The ``handler`` is the Client's method of ``handler_name`` unless
+        given.
+        """
+        if handler is None:
+            handler = getattr(self.client, handler_name)
+
+        entry = handler, handler_name, topic, match, dispatcher
+        self.handlers.setdefault(subscription_id, []).append(entry)
+        self.topic_trie.insert(topic, match, (subscription_id, entry))
+        self.handler_subscriptions[handler_name] = subscription_id
+
+        if subscription_id not in self.subscription_map:
+            self.subscription_map[subscription_id] = handler_name, topic
+        if dispatcher is not None:
+            self.event_dispatchers[handler_name] = dispatcher
+
+    def remove_subscription(self, handler_name):
+        """ Detach a handler from its subscription.
+
+        Subscriptions are shared and so counted by their handlers: when
+        the last has gone the subscription ID is returned, for the
+        caller to UNSUBSCRIBE from the Router and then
+        :meth:`forget_subscription`. Otherwise returns ``None``.
+        """
+        try:
+            subscription_id = self.handler_subscriptions.pop(handler_name)
+        except KeyError:
+            raise WampyError("not subscribed: {}".format(handler_name))
+
+        entries = self.handlers[subscription_id]
+        for entry in entries:
+            if entry[1] == handler_name:
+                break
+
+        entries.remove(entry)
+        _, _, topic, match, dispatcher = entry
+        self.topic_trie.remove(topic, match, (subscription_id, entry))
+
+        if dispatcher is not None:
+            self.event_dispatchers.pop(handler_name, None)
+            dispatcher.stop()
+
+        if entries:
+            return None
+
+        # no longer to be shared by anything subscribed from now on,
+        # while the empty handler list absorbs any EVENT still on its way
+        for key, value in self.router_subscriptions.items():
+            if value == subscription_id:
+                del self.router_subscriptions[key]
+
+        return subscription_id
+
+    def forget_subscription(self, subscription_id):
+        """ Drop a subscription the Router has confirmed is gone, unless
+        it has been subscribed to again since, as a Broker may give a
+        topic the same subscription ID for as long as anyone is
+        subscribed to it. """
+        if self.handlers.get(subscription_id):
+            return
+
+        self.handlers.pop(subscription_id, None)
+        self.subscription_map.pop(subscription_id, None)
+
+    def handlers_for(self, subscription_id, topic):
+        """ The handlers of a subscription to call for an event published
+        to the concrete ``topic``. """
+        entries = self.handlers.get(subscription_id, [])
+        if len(entries) == 1:
+            # the Router has matched the topic against the subscription,
+            # which this handler's own pattern may be narrower than
+            _, _, pattern, match, _ = entries[0]
+            if topic_matches(pattern, match, topic):
+                return entries
+            return []
+
+        return [
+            entry for owner, entry in self.topic_trie.match(topic)
+            if owner == subscription_id
+        ]
+
+    def drain(self, timeout=DEFAULT_DRAIN_TIMEOUT):
+        """ Stop taking on new work and wait for the work in hand.
+
+        Every procedure is unregistered so that the Dealer routes no
+        more calls here, and events published from now on are dropped.
+        Then invocations and event handlers that are running, or queued
+        on a dispatcher, are given up to ``timeout`` seconds to finish.
+
+        Returns ``True`` if they all finished in time. The Session is
+        left open, to say GOODBYE with :meth:`end`.
+
+        """
+        # a Session on its way out is not worth reconnecting
+        self._ending = True
+        # the subscriptions stay, to be ended along with the Session, but
+        # an active topic would otherwise keep it busy for good
+        self.draining = True
+        deadline = now() + timeout
+
+        self.unregister_all(timeout=timeout)
+
+        while self.busy:
+            if now() > deadline:
+                logger.warning(
+                    'gave up draining after %ss: %s invocations, %s '
+                    'handlers', timeout, len(self.running_invocations),
+                    self.running_handlers + sum(
+                        d.pending for d in self.event_dispatchers.values()),
+                )
+                return False
+            eventlet.sleep(0.05)
+
+        return True
+
+    @property
+    def busy(self):
+        return bool(
+            self.running_invocations or self.running_handlers or any(
+                dispatcher.pending
+                for dispatcher in self.event_dispatchers.values())
+        )
+
+    def unregister_all(self, timeout=5):
+        names = list(self.registration_map)
+        messages = [
+            Unregister(registration_id=self.registration_map[name])
+            for name in names
+        ]
+
+        responses = self.request_all(messages, timeout=timeout)
+
+        for name, response in zip(names, responses):
+            if response is None or response[0] != Message.UNREGISTERED:
+                logger.error('failed to unregister %s: %s', name, response)
+                continue
+
+            # the dispatch table is kept for any INVOCATION that was
+            # already on its way when the Dealer unregistered us
+            del self.registration_map[name]
+            self.declared_procedures.pop(name, None)
+
+        logger.info('unregistered %s procedures', len(messages))
+
+    def router_supports(self, role, feature):
+        roles = self.router_details.get('roles', {})
+        features = roles.get(role, {}).get('features', {})
+        return features.get(feature, False)
 
     def send_message(self, message):
-        message_type = MESSAGE_TYPE_MAP[message.WAMP_CODE]
+        wamp_code = message.WAMP_CODE
+        if self._connection is None:
+            raise ConnectionError("not connected to {}".format(self.host))
+
+        message_type = MESSAGE_TYPE_MAP[wamp_code]
         message = message.serialize()
 
         logger.debug(
             'sending "%s" message: %s', message_type, message
         )
 
-        self._connection.send_websocket_frame(str(message))
+        self.outbound.send_message(wamp_code, str(message))
+
+    def _send_frame(self, message):
+        self._connection.send_websocket_frame(message)
+
+    def send_request(self, message, on_response=None):
+        """ Send a message the Router will respond to and return the
+        queue that the response(s) will be put on.
+
+        ``on_response`` is called with each response as soon as it is
+        read, before anything after it is, and before it is put on the
+        queue.
+        """
+        responses = eventlet.Queue()
+        self._requests[message.request_id] = responses
+        if on_response is not None:
+            self._response_callbacks[message.request_id] = on_response
+
+        try:
+            self.send_message(message)
+        except Exception:
+            self.forget_request(message.request_id)
+            raise
+
+        return responses
+
+    def request_all(self, messages, timeout=5, on_response=None):
+        """ Send all the requests back-to-back, without waiting on the
+        Router in between, and then wait for each to be answered.
+
+        Returns the responses in the order of ``messages``, with
+        ``None`` for any request that had no response within
+        ``timeout`` seconds of the last being sent. Such a request is
+        abandoned, and should it be answered after all, a registration
+        or subscription it made is undone.
+
+        ``on_response`` is called with the index of the message and its
+        response as soon as each is read. The Router may route traffic
+        for a registration or subscription it has confirmed straight
+        away, so this is the moment to be ready for it, rather than once
+        every response is in.
+        """
+        pending = []
+        for index, message in enumerate(messages):
+            callback = None
+            if on_response is not None:
+                callback = partial(on_response, index)
+            pending.append(
+                (message, self.send_request(message, on_response=callback)))
+
+        deadline = now() + timeout
+
+        responses = []
+        for message, queue in pending:
+            try:
+                response = queue.get(timeout=max(0, deadline - now()))
+            except Empty:
+                # unless it was read just as the time ran out
+                response = None if queue.empty() else queue.get_nowait()
+
+            if response is None:
+                logger.error('no response to: %s', message.message)
+                self.abandon_request(message.request_id)
+            else:
+                self.forget_request(message.request_id)
+
+            responses.append(response)
+
+        return responses
+
+    def forget_request(self, request_id):
+        self._requests.pop(request_id, None)
+        self._response_callbacks.pop(request_id, None)
+
+    def abandon_request(self, request_id):
+        """ Drop every response to ``request_id`` from now on, up to and
+        including its final one, e.g. the rest of a progressive result.
+
+        A request that is never answered is given up on after
+        ``ABANDONED_REQUEST_TTL`` seconds, or sooner once more than
+        ``MAX_ABANDONED_REQUESTS`` are abandoned.
+        """
+        self.forget_request(request_id)
+
+        abandoned = self._abandoned_requests
+        abandoned[request_id] = now() + ABANDONED_REQUEST_TTL
+
+        # all with the same TTL, so the oldest are the first to expire
+        while abandoned and (
+                len(abandoned) > MAX_ABANDONED_REQUESTS or
+                next(iter(abandoned.values())) < now()
+        ):
+            abandoned.popitem(last=False)
+
+    def deliver_response(self, message):
+        wamp_code = message[0]
+        if wamp_code == Message.ERROR:
+            request_id = message[2]
+        elif wamp_code in (
+                Message.RESULT, Message.REGISTERED, Message.SUBSCRIBED,
+                Message.UNREGISTERED, Message.UNSUBSCRIBED,
+        ):
+            request_id = message[1]
+        else:
+            return False
+
+        expiry = self._abandoned_requests.get(request_id)
+        if expiry is not None and expiry >= now():
+            logger.warning(
+                'dropping response to abandoned request %s', request_id)
+            is_progress = (
+                wamp_code == Message.RESULT and message[2].get('progress'))
+            if not is_progress:
+                # the last there will be
+                del self._abandoned_requests[request_id]
+                self._undo_orphan(message)
+            return True
+
+        responses = self._requests.get(request_id)
+        if responses is None:
+            return False
+
+        callback = self._response_callbacks.pop(request_id, None)
+        if callback is not None:
+            try:
+                callback(message)
+            except Exception:
+                # never at the cost of the reader
+                logger.exception(
+                    'failed to handle the response to %s', request_id)
+
+        responses.put(message)
+        return True
+
+    def _undo_orphan(self, message):
+        """ Undo a registration or subscription confirmed only after its
+        request was abandoned, as nothing here would handle its traffic.
+        """
+        wamp_code = message[0]
+        if wamp_code == Message.REGISTERED:
+            registration_id = message[2]
+            if registration_id in self.procedures:
+                return
+            request = Unregister(registration_id=registration_id)
+        elif wamp_code == Message.SUBSCRIBED:
+            subscription_id = message[2]
+            # a Broker answers a repeated subscription with the same ID
+            if subscription_id in self.subscription_map:
+                return
+            request = Unsubscribe(subscription_id=subscription_id)
+        else:
+            return
+
+        logger.warning(
+            'undoing %s %s, confirmed after its request was abandoned',
+            MESSAGE_TYPE_MAP[wamp_code], message[2],
+        )
+        # and its answer is of no interest either
+        self.abandon_request(request.request_id)
+        self.send_message(request)
+
+    def interrupt_invocation(self, request_id):
+        gthread = self.running_invocations.pop(request_id, None)
+        if gthread is None:
+            return
+
+        gthread.kill()
+
+        error = Error(
+            Message.ERROR, Message.INVOCATION, request_id,
+            error="wamp.error.canceled",
+        )
+        self.send_message(error)
 
     def recv_message(self, timeout=5):
         logger.debug('waiting for message')
@@ -163,11 +648,164 @@ class Session(object):
 
         logger.debug('disconnected from %s', self.host)
 
+    def _recover(self):
+        """ Reconnect after the connection was lost, backing off between
+        attempts, and then restore the Session. """
+        lost_at = now()
+        logger.warning('lost connection to %s', self.host)
+
+        self._fail_requests()
+        self._kill_invocations()
+
+        for attempt, delay in enumerate(backoff_delays(), 1):
+            eventlet.sleep(delay)
+            if self._ending:
+                return
+
+            # a Router that is still starting may accept the connection
+            # and never answer the upgrade, which has no timeout of its own
+            timeout = eventlet.Timeout(
+                RECONNECT_ATTEMPT_TIMEOUT,
+                WampyTimeOutError("no answer from the Router"),
+            )
+            try:
+                self._close_transport()
+                self._connect()
+                # anything left from the old connection is not the WELCOME
+                self._message_queue.clear()
+                self._say_hello()
+                self._restore()
+            except Exception as exc:
+                logger.warning(
+                    'reconnection attempt %s to %s failed: %s',
+                    attempt, self.host, exc)
+            else:
+                break
+            finally:
+                timeout.cancel()
+
+        self._recovery_thread = None
+        self.last_recovery_time = now() - lost_at
+        logger.info(
+            'recovered session with %s in %.3fs after %s attempt(s)',
+            self.host, self.last_recovery_time, attempt)
+
+    def _restore(self):
+        """ Pipeline a REGISTER and SUBSCRIBE for everything declared on
+        the lost connection.
+
+        Each is ready for traffic as soon as the Router confirms it, and
+        under the new ID alongside the old. Only once everything is
+        restored are the old IDs forgotten, so that a failed attempt
+        leaves all of it for the next.
+        """
+        handlers = self.handlers
+        subscriptions = self.router_subscriptions.items()
+
+        # memoized results carry the ID of the Session that is gone
+        for memo in self.memos.values():
+            memo.clear()
+
+        names, messages = [], []
+        for procedure_name, options in self.declared_procedures.items():
+            names.append(procedure_name)
+            messages.append(
+                Register(procedure=procedure_name, options=options))
+
+        for (topic, match), subscription_id in subscriptions:
+            names.append((topic, match))
+            options = {} if match == EXACT else {'match': match}
+            messages.append(Subscribe(topic=topic, options=options))
+
+        def restored(index, response):
+            name = names[index]
+            if response[0] == Message.REGISTERED:
+                self.add_registration(name, response[2])
+            elif response[0] == Message.SUBSCRIBED:
+                subscription_id = response[2]
+                self.router_subscriptions[name] = subscription_id
+                restored_entries = self.handlers.get(subscription_id, [])
+                for entry in handlers.get(dict(subscriptions)[name], []):
+                    if entry in restored_entries:
+                        continue
+                    handler, handler_name, topic, match, dispatcher = entry
+                    self.add_subscription(
+                        handler_name, topic, subscription_id, dispatcher,
+                        match, handler,
+                    )
+
+        responses = self.request_all(messages, on_response=restored)
+
+        for name, response in zip(names, responses):
+            if response is None or response[0] == Message.ERROR:
+                raise WampProtocolError(
+                    "failed to restore {}: {}".format(name, response))
+
+        self._forget_stale_ids()
+
+        logger.info(
+            'restored %s registrations and %s subscriptions',
+            len(self.registration_map), len(self.subscription_map))
+
+    def _forget_stale_ids(self):
+        registration_ids = set(self.registration_map.values())
+        for registration_id in list(self.procedures):
+            if registration_id not in registration_ids:
+                del self.procedures[registration_id]
+
+        subscription_ids = set(self.router_subscriptions.values())
+        for subscription_id in list(self.handlers):
+            if subscription_id in subscription_ids:
+                continue
+
+            for entry in self.handlers.pop(subscription_id):
+                _, _, topic, match, _ = entry
+                self.topic_trie.remove(topic, match, (subscription_id, entry))
+            self.subscription_map.pop(subscription_id, None)
+
+    def _fail_requests(self):
+        # the Router forgets any outstanding request along with the Session
+        requests, self._requests = self._requests, {}
+        self._response_callbacks = {}
+        for request_id, responses in requests.items():
+            error = Error(
+                Message.ERROR, Message.CALL, request_id,
+                error="wamp.close.transport_lost",
+            )
+            responses.put(error.message)
+
+    def _kill_invocations(self):
+        invocations, self.running_invocations = self.running_invocations, {}
+        for gthread in invocations.values():
+            gthread.kill()
+
+    def _close_transport(self):
+        socket = getattr(self.transport, 'socket', None)
+        if socket is None:
+            return
+
+        try:
+            socket.close()
+        except Exception as exc:
+            logger.debug('failed to close socket: %s', exc)
+
+    def _stop_dispatchers(self):
+        for dispatcher in self.event_dispatchers.values():
+            dispatcher.stop()
+
+        self.event_dispatchers = {}
+
+    def _stop_executors(self):
+        for executor in self.executors.values():
+            executor.stop()
+
+        self.executors = {}
+
     def _say_hello(self):
         message = Hello(self.realm, self.roles)
         self.send_message(message)
         response = self.recv_message()
-        wamp_code, session_id, _ = response
+        wamp_code, session_id, details = response
 
         # the server may request us to authenticate
         if wamp_code == Message.CHALLENGE:
@@ -178,7 +816,7 @@ class Session(object):
             message = Authenticate(signature)
             self.send_message(message)
             response = self.recv_message()
-            wamp_code, session_id, _ = response
+            wamp_code, session_id, details = response
 
         # response message must be either WELCOME or ABORT
         if wamp_code not in [Message.WELCOME, Message.ABORT]:
@@ -189,6 +827,9 @@ class Session(object):
             )
 
         self.session_id = session_id
+        if wamp_code == Message.WELCOME:
+            self.router_details = details
+
         return response
 
     def _say_goodbye(self):
@@ -214,17 +855,34 @@ class Session(object):
 
     def _listen_on_connection(self, connection, message_queue):
         def connection_handler():
-            while True:
-                try:
+            try:
+                while True:
                     frame = connection.read_websocket_frame()
                     if frame:
                         message = frame.payload
-                        self.message_handler(message)
-                except (
-                        SystemExit, KeyboardInterrupt, ConnectionError,
-                        WampProtocolError,
-                ):
-                    break
+                        try:
+                            self.message_handler(message)
+                        except WampProtocolError:
+                            raise
+                        except Exception:
+                            # one message handled badly is no reason to
+                            # drop a healthy connection
+                            logger.exception(
+                                'failed to handle message: %s', message)
+            except (
+                    SystemExit, KeyboardInterrupt, ConnectionError,
+                    WampProtocolError,
+            ):
+                pass
+            except Exception:
+                # a reader that dies unnoticed leaves a Client deaf for
+                # good, so a failure to read is a lost connection
+                logger.exception('stopped reading from %s', self.host)
+
+            # not when killed, as by ``end``
+            recovering = self._recovery_thread is not None
+            if self.reconnect and not self._ending and not recovering:
+                self._recovery_thread = eventlet.spawn(self._recover)
 
         gthread = eventlet.spawn(connection_handler)
         self._managed_thread = gthread
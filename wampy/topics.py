@@ -0,0 +1,185 @@
+""" Topic matching for pattern-based subscriptions.
+
+A Broker matches a published topic against a subscription's pattern in
+one of three ways ::
+
+    exact       "com.acme.sensor.1.reading" only
+    prefix      "com.acme.sensor" matches any topic that starts with it
+    wildcard    "com.acme.sensor..reading" matches any topic with the
+                same number of components, an empty component matching
+                any component
+
+"""
+from wampy.errors import WampyError
+
+EXACT = "exact"
+PREFIX = "prefix"
+WILDCARD = "wildcard"
+
+MATCH_POLICIES = (EXACT, PREFIX, WILDCARD)
+
+
+def validate_match(match):
+    if match not in MATCH_POLICIES:
+        raise WampyError(
+            "match must be one of {}, not: {}".format(
+                ", ".join(MATCH_POLICIES), match)
+        )
+
+
+def wildcard_matches(pattern, topic):
+    pattern_components = pattern.split('.')
+    topic_components = topic.split('.')
+    if len(pattern_components) != len(topic_components):
+        return False
+
+    return all(
+        expected == '' or expected == actual
+        for expected, actual in zip(pattern_components, topic_components)
+    )
+
+
+def topic_matches(pattern, match, topic):
+    """ Whether the concrete ``topic`` is matched by ``pattern`` under
+    ``match``. """
+    if match == EXACT:
+        return topic == pattern
+    if match == PREFIX:
+        return topic.startswith(pattern)
+    return wildcard_matches(pattern, topic)
+
+
+def covers(pattern, match, topic, topic_match):
+    """ Whether every topic matched by ``topic`` under ``topic_match`` is
+    also matched by ``pattern`` under ``match``. """
+    if match == EXACT:
+        return topic_match == EXACT and topic == pattern
+
+    if match == PREFIX:
+        if topic_match == WILDCARD:
+            components = topic.split('.')
+            if '' in components:
+                # every match starts with the components before the
+                # first wildcard
+                head = components[:components.index('')]
+                topic = '.'.join(head) + '.'
+        return topic.startswith(pattern)
+
+    if topic_match == PREFIX:
+        return False
+
+    # an empty component in ``topic`` is only covered by one in
+    # ``pattern``, which is just what matching it as a topic checks
+    return wildcard_matches(pattern, topic)
+
+
+def breadth(topic, match):
+    """ A sort key that puts the patterns matching the most topics first,
+    so that narrower patterns can share their subscription. """
+    if match == PREFIX:
+        return 0, len(topic)
+    if match == WILDCARD:
+        return 1, -topic.split('.').count('')
+    return 2, 0
+
+
+class _Node(object):
+    __slots__ = ('children', 'values')
+
+    def __init__(self):
+        self.children = {}
+        self.values = []
+
+
+class TopicTrie(object):
+    """ Finds every pattern matching a concrete topic at once.
+
+    Exact topics are held in a dict, prefixes in a trie of characters
+    (as a prefix may end part way through a component) and wildcards in
+    a trie of components, so a lookup costs in the length of the topic
+    rather than in the number of patterns.
+
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._prefixes = _Node()
+        self._wildcards = _Node()
+
+    def __len__(self):
+        return sum(1 for _ in self._all_values())
+
+    def insert(self, pattern, match, value):
+        validate_match(match)
+        if match == EXACT:
+            self._exact.setdefault(pattern, []).append(value)
+        else:
+            self._node(pattern, match, create=True).values.append(value)
+
+    def remove(self, pattern, match, value):
+        if match == EXACT:
+            values = self._exact.get(pattern, [])
+            if value in values:
+                values.remove(value)
+            if not values:
+                self._exact.pop(pattern, None)
+            return
+
+        node = self._node(pattern, match, create=False)
+        if node is not None and value in node.values:
+            node.values.remove(value)
+
+    def match(self, topic):
+        matches = list(self._exact.get(topic, []))
+
+        node = self._prefixes
+        matches.extend(node.values)
+        for character in topic:
+            node = node.children.get(character)
+            if node is None:
+                break
+            matches.extend(node.values)
+
+        self._match_wildcards(self._wildcards, topic.split('.'), matches)
+        return matches
+
+    def _node(self, pattern, match, create):
+        if match == PREFIX:
+            node, keys = self._prefixes, pattern
+        else:
+            node, keys = self._wildcards, pattern.split('.')
+
+        for key in keys:
+            child = node.children.get(key)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[key] = _Node()
+            node = child
+
+        return node
+
+    def _match_wildcards(self, node, components, matches):
+        if not components:
+            matches.extend(node.values)
+            return
+
+        component, rest = components[0], components[1:]
+        for key in (component, ''):
+            child = node.children.get(key)
+            if child is not None:
+                self._match_wildcards(child, rest, matches)
+            if component == '':
+                break
+
+    def _all_values(self):
+        for values in self._exact.values():
+            for value in values:
+                yield value
+
+        stack = [self._prefixes, self._wildcards]
+        while stack:
+            node = stack.pop()
+            for value in node.values:
+                yield value
+            stack.extend(node.children.values())